@@ -1,100 +1,171 @@
+import argparse
 import asyncio
-from mealie_client import MealieClient
-from mealie_client.models.food import FoodUpdateRequest
-from SPARQLWrapper import SPARQLWrapper, JSON
-from common import BASE_URL, API_TOKEN
-
-
-def get_wikidata_info(food_name):
-    sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
-    sparql.setReturnFormat(JSON)
-
-    # Match on label OR alias, and fetch aliases + description
-    query = f"""
-    SELECT ?item ?alias ?itemDescription WHERE {{
-      ?item (rdfs:label|skos:altLabel) "{food_name}"@en .
-      FILTER(LANG(?itemDescription) = "en")
-      OPTIONAL {{ ?item skos:altLabel ?alias FILTER(LANG(?alias) = "en") }}
-      SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-      
-      {{
-        ?item (wdt:P31/(wdt:P279*)) wd:Q42527 .    # spice or subclass
-      }} UNION {{
-        ?item (wdt:P31/(wdt:P279*)) wd:Q25403900 . # food ingredient or subclass
-      }} UNION {{
-        ?item (wdt:P31/(wdt:P279*)) wd:Q185217 . # dairy product
-      }}
-    }}
-    """
-    sparql.setQuery(query)
+from mealie_client.models.food import FoodSummary
+from checkpoint import add_checkpoint_arguments, open_checkpoint
+from common import mealie_session
+from pagination import paginate
+from pipeline import WRITE_CONCURRENCY
+from profiling import add_profile_arguments
+from wikidata import (
+    BATCH_SIZE,
+    CACHE_TTL_DAYS,
+    CONCURRENCY,
+    AsyncWikidataClient,
+    WikidataCache,
+)
+from wikidata_index import WikidataIndex
+
+
+async def update_food(
+    client, food, aliases: list[str], description: str | None, slots: asyncio.Semaphore
+):
+    updated = False
+
+    # Add aliases if missing
+    if aliases:
+        existing_alias_names = {a["name"] for a in food.aliases}
+        new_aliases = [
+            {"name": alias_name}
+            for alias_name in aliases
+            if alias_name not in existing_alias_names
+            and alias_name != food.name
+        ]
+        if new_aliases:
+            print(
+                f"  '{food.name}': adding aliases: "
+                f"{', '.join(a['name'] for a in new_aliases)}"
+            )
+            food.aliases.extend(new_aliases)
+            updated = True
+    else:
+        print(f"  '{food.name}': no aliases found on Wikidata.")
+
+    # Set description if missing
+    if not food.description and description:
+        print(f"  '{food.name}': setting description from Wikidata: {description}")
+        food.description = description
+        updated = True
+
+    if updated:
+        updated_food = {
+            "name": food.name,
+            "description": food.description,
+            "aliases": food.aliases,
+        }
+        async with slots:
+            await client.foods.update(food_id=food.id, food=updated_food)
+        print(f"  Updated '{food.name}' successfully.")
+    else:
+        print(f"  No updates required for '{food.name}'.")
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Food names resolved per SPARQL query (default: {BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONCURRENCY,
+        help=f"Wikidata queries in flight at once (default: {CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=CACHE_TTL_DAYS,
+        help="Days to trust cached Wikidata answers, including misses "
+        f"(default: {CACHE_TTL_DAYS:g}).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the Wikidata cache and query every food.",
+    )
+    parser.add_argument(
+        "--index",
+        help="Look foods up in an offline index built by wikidata_index.py "
+        "instead of querying Wikidata.",
+    )
+    add_profile_arguments(parser)
+    add_checkpoint_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    checkpoint = open_checkpoint(args, "wikidata_aliases")
+    print("Fetching all foods from Mealie…")
+
+    all_foods_dict = {
+        item["name"]: FoodSummary.from_dict(item)
+        async for item in paginate(client, "foods")
+        if item["id"] not in checkpoint.done
+    }
+
+    print(f"Found {len(all_foods_dict)} foods to process.\n")
+
+    cache = None
+    if args.index:
+        print(f"Looking foods up in the offline index {args.index}…")
+        wikidata = WikidataIndex(args.index)
+    else:
+        print(
+            f"Querying Wikidata in batches of {args.batch_size}, "
+            f"{args.concurrency} at a time…"
+        )
+        if not args.no_cache:
+            cache = WikidataCache(ttl_days=args.cache_ttl)
+        wikidata = AsyncWikidataClient(cache=cache, concurrency=args.concurrency)
+    # Mealie updates start as soon as a batch answers, while the
+    # remaining Wikidata queries are still in flight.
+    update_slots = asyncio.Semaphore(WRITE_CONCURRENCY)
+
+    async def update(food, aliases: list[str], description: str | None):
+        await update_food(client, food, aliases, description, update_slots)
+        await checkpoint.handled(food.id)
 
     try:
-        results = sparql.query().convert()
-        aliases = set()
-        description = None
-        for result in results["results"]["bindings"]:
-            if "alias" in result:
-                aliases.add(result["alias"]["value"])
-            if "itemDescription" in result:
-                description = result["itemDescription"]["value"]
-        return list(aliases), description
-    except Exception as e:
-        print(f"Error querying Wikidata for '{food_name}': {e}")
-        return [], None
-
-
-async def main():
-    async with MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client:
-        print("Fetching all foods from Mealie…")
-
-        all_foods_list = await client.foods.get_all()
-        all_foods_dict = {food.name: food for food in all_foods_list}
-
-        print(f"Found {len(all_foods_dict)} foods to process.\n")
-
-        for food in all_foods_list:
-            if food.name not in all_foods_dict:
-                continue
-
-            aliases, description = get_wikidata_info(food.name)
-
-            updated = False
-
-            # Add aliases if missing
-            if aliases:
-                existing_alias_names = {a["name"] for a in food.aliases}
-                new_aliases = [
-                    {"name": alias_name}
-                    for alias_name in aliases
-                    if alias_name not in existing_alias_names
-                    and alias_name != food.name
-                ]
-                if new_aliases:
-                    print(
-                        f"  Adding aliases: {', '.join(a['name'] for a in new_aliases)}"
-                    )
-                    food.aliases.extend(new_aliases)
-                    updated = True
-            else:
-                print("  No aliases found on Wikidata.")
-
-            # Set description if missing
-            if not food.description and description:
-                print(f"  Setting description from Wikidata: {description}")
-                food.description = description
-                updated = True
-
-            if updated:
-                updated_food = {
-                    "name": food.name,
-                    "description": food.description,
-                    "aliases": food.aliases,
-                }
-                await client.foods.update(food_id=food.id, food=updated_food)
-                print(f"  Updated '{food.name}' successfully.\n")
-            else:
-                print(f"  No updates required for '{food.name}'.\n")
+        async with asyncio.TaskGroup() as tg:
+            async for name, (aliases, description) in wikidata.lookup(
+                list(all_foods_dict), args.batch_size
+            ):
+                tg.create_task(update(all_foods_dict[name], aliases, description))
+    except (Exception, asyncio.CancelledError):
+        try:
+            await checkpoint.save()
+            print("\n⚠ Stopped early; rerun with --resume to continue.")
+        except Exception:
+            pass
+        raise
+    else:
+        # Foods in a batch Wikidata failed to answer were never handled
+        unanswered = sum(
+            food.id not in checkpoint.done for food in all_foods_dict.values()
+        )
+        if unanswered:
+            await checkpoint.save()
+            print(
+                f"\n⚠ {unanswered} foods got no answer from Wikidata; rerun "
+                "with --resume to retry them."
+            )
+        else:
+            checkpoint.finish()
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(
+        description="Enrich ingredients with aliases and descriptions from Wikidata."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+# Recipes whose matching is shipped to a worker process at once
+BATCH_SIZE = 32
+
+# A module-level function and its arguments, e.g. (find_matching_tools, (...))
+Call = tuple[Callable, tuple]
+
+
+def run_calls(calls: list[Call | None]) -> list:
+    return [None if call is None else call[0](*call[1]) for call in calls]
+
+
+def _run_batch(batch: list[list[Call | None]]) -> list[list]:
+    return [run_calls(calls) for calls in batch]
+
+
+class AnalysisPool:
+    """
+    Runs the CPU-bound text matching of many recipes in worker processes
+    while the event loop carries on with requests.
+
+    Each recipe's calls are collected into batches of `batch_size` recipes,
+    so a round trip to a worker carries enough work to pay for pickling it.
+    The calls are plain module-level functions: a worker imports their
+    module, and so compiles its patterns, once.
+    """
+
+    def __init__(self, workers: int, batch_size: int = BATCH_SIZE):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.executor = ProcessPoolExecutor(workers)
+        self._batch: list[tuple[list[Call | None], asyncio.Future]] = []
+        self._flush_scheduled = False
+
+    @property
+    def capacity(self) -> int:
+        """Recipes to have in flight so no worker waits for its next batch."""
+        return self.workers * self.batch_size * 2
+
+    async def run(self, calls: list[Call | None]) -> list:
+        """The results of one recipe's calls, in order."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((calls, future))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            # Let the other recipes ready in this loop iteration join the batch
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        self._flush_scheduled = False
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        futures = [future for _, future in batch]
+        done = asyncio.get_running_loop().run_in_executor(
+            self.executor, _run_batch, [calls for calls, _ in batch]
+        )
+
+        def deliver(done: asyncio.Future):
+            for i, future in enumerate(futures):
+                if future.done():
+                    continue
+                if done.cancelled():
+                    future.cancel()
+                elif (error := done.exception()) is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[i])
+
+        done.add_done_callback(deliver)
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+def add_analysis_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--analysis-workers",
+        type=int,
+        default=0,
+        help="Worker processes for the text matching; 0 matches in the main "
+        "process (default: 0).",
+    )
+    parser.add_argument(
+        "--analysis-batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Recipes sent to a worker at once (default: {BATCH_SIZE}).",
+    )
+
+
+def open_analysis_pool(args: argparse.Namespace) -> AnalysisPool | None:
+    if getattr(args, "analysis_workers", 0) <= 0:
+        return None
+    return AnalysisPool(args.analysis_workers, args.analysis_batch_size)
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import json
+from dataclasses import dataclass
+from common import mealie_session
+from profiling import add_profile_arguments
+
+APPLY_CONCURRENCY = 32
+PROGRESS_EVERY = 100
+
+_DONE = object()
+
+
+@dataclass
+class ApplyStats:
+    applied: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+def read_plan(path: str) -> dict[str, list[dict]]:
+    """Group the plan's entries by recipe id, keeping file order."""
+    plan: dict[str, list[dict]] = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                plan.setdefault(entry["id"], []).append(entry)
+    return plan
+
+
+def _ids(items: list[dict]) -> set[str]:
+    return {item["id"] for item in items}
+
+
+async def apply_recipe(client, recipe_id: str, entries: list[dict]) -> bool:
+    """
+    PATCH the planned fields of one recipe, unless any of them no longer
+    holds what the plan saw. Returns whether the recipe was updated.
+    """
+    current = await client.get(f"recipes/{recipe_id}")
+    for entry in entries:
+        if _ids(current.get(entry["field"]) or []) != _ids(entry["before"]):
+            print(
+                f"⚠ '{entry['name']}': {entry['field']} changed since the plan "
+                "was made, skipping."
+            )
+            return False
+    await client.patch(
+        f"recipes/{recipe_id}",
+        json_data={entry["field"]: entry["after"] for entry in entries},
+    )
+    return True
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("plan", help="JSONL plan file.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=APPLY_CONCURRENCY,
+        help=f"Recipes updated at once (default: {APPLY_CONCURRENCY}).",
+    )
+    add_profile_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    plan = read_plan(args.plan)
+    total = len(plan)
+    print(f"Applying {total} recipe changes from {args.plan}…")
+
+    stats = ApplyStats()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency)
+
+    async def worker():
+        while (item := await queue.get()) is not _DONE:
+            recipe_id, entries = item
+            try:
+                if await apply_recipe(client, recipe_id, entries):
+                    stats.applied += 1
+                else:
+                    stats.skipped += 1
+            except Exception as e:
+                print(f"❌ '{entries[0]['name']}': {e}")
+                stats.failed += 1
+            done = stats.applied + stats.skipped + stats.failed
+            if done % PROGRESS_EVERY == 0:
+                print(f"  {done}/{total} recipes…")
+
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(args.concurrency):
+            tg.create_task(worker())
+        for item in plan.items():
+            await queue.put(item)
+        for _ in range(args.concurrency):
+            await queue.put(_DONE)
+
+    print(
+        f"\nDone. Applied {stats.applied}, skipped {stats.skipped} changed "
+        f"since the plan, {stats.failed} failed."
+    )
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Apply a change plan written with --plan by assign_tools, "
+        "tag_vegetarian, update_recipe_categories or maintain."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -1,8 +1,10 @@
+import argparse
 import asyncio
 import re
-from mealie_client import MealieClient
-from mealie_client.models.common import RecipeInstruction, RecipeTool
-from common import BASE_URL, API_TOKEN
+from common import mealie_session
+from pagination import get_organizers
+from profiling import profiled
+from rules import Rule, add_rule_arguments, run_rules
 
 # Maps regex patterns (lowercase) to Mealie tool names
 TOOL_KEYWORDS: dict[str, str] = {
@@ -58,6 +60,23 @@ TOOL_KEYWORDS: dict[str, str] = {
 }
 
 
+# Every TOOL_KEYWORDS pattern is a word boundary followed by a lowercase
+# literal, so they fold into one scan: a zero-width lookahead alternation is
+# tried once at each word start that begins with a possible first letter.
+_TOOL_NAMES: list[str] = list(TOOL_KEYWORDS.values())
+_TOOL_PATTERNS: list[re.Pattern] = [re.compile(pattern) for pattern in TOOL_KEYWORDS]
+_TOOL_MATCHER = re.compile(
+    r"\b(?=["
+    + "".join(sorted({pattern[2] for pattern in TOOL_KEYWORDS}))
+    + "])(?="
+    + "|".join(
+        f"(?P<t{i}>{pattern[2:]})" for i, pattern in enumerate(TOOL_KEYWORDS)
+    )
+    + ")"
+)
+
+
+@profiled
 def find_matching_tools(
     recipe_tool_names: set[str],
     instruction_text: str,
@@ -66,95 +85,83 @@ def find_matching_tools(
     matched = set()
     text_to_search = f"{recipe_name} {instruction_text}".lower()
 
-    for pattern, tool_name in TOOL_KEYWORDS.items():
-        if re.search(pattern, text_to_search, re.IGNORECASE):
-            matched.add(tool_name)
+    for match in _TOOL_MATCHER.finditer(text_to_search):
+        # The alternation only reports the first pattern that matches here;
+        # later ones can match at the same spot too ("toaster" and
+        # "toaster oven"), so check those directly.
+        first = int(match.lastgroup[1:])
+        matched.add(_TOOL_NAMES[first])
+        for i in range(first + 1, len(_TOOL_PATTERNS)):
+            if _TOOL_NAMES[i] not in matched and _TOOL_PATTERNS[i].match(
+                text_to_search, match.start()
+            ):
+                matched.add(_TOOL_NAMES[i])
 
     return matched - recipe_tool_names
 
 
-async def main():
-    async with MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client:
+class ToolsRule(Rule):
+    """Add the tools a recipe's name or instructions mention."""
+
+    name = "tools"
+    fields = frozenset({"name", "tools", "instructions"})
+
+    async def load(self, client, snapshot=None) -> bool:
         print("Fetching tools from Mealie…")
-        tools_response = await client.get("organizers/tools")
-        if isinstance(tools_response, dict) and "items" in tools_response:
-            tools_data = tools_response["items"]
-        elif isinstance(tools_response, list):
-            tools_data = tools_response
-        else:
-            tools_data = []
-
-        available_tools: dict[str, RecipeTool] = {}
-        for t in tools_data:
-            tool = RecipeTool.from_dict(t) if isinstance(t, dict) else t
-            available_tools[tool.name.lower()] = tool
-
-        print(f"Found {len(available_tools)} tools in Mealie.\n")
-
-        print("Fetching recipes from Mealie…")
-        all_recipes: list = []
-        page = 1
-        while True:
-            batch = await client.recipes.get_all(per_page=100, page=page)
-            if not batch:
-                break
-            all_recipes.extend(batch)
-            if len(batch) < 100:
-                break
-            page += 1
-        print(f"Found {len(all_recipes)} recipes.\n")
-
-        updated_count = 0
-        for recipe_summary in all_recipes:
-            recipe = await client.recipes.get(recipe_summary.id)
-            recipe.tools = [
-                RecipeTool.from_dict(t) if isinstance(t, dict) else t
-                for t in recipe.tools
-            ]
-            existing_tool_names = {t.name for t in recipe.tools}
-
-            recipe.recipeInstructions = [
-                RecipeInstruction.from_dict(s) if isinstance(s, dict) else s
-                for s in recipe.recipeInstructions
-            ]
-            instruction_text = " ".join(
-                step.text for step in recipe.recipeInstructions if step.text
-            )
-
-            matched_names = find_matching_tools(
-                existing_tool_names, instruction_text, recipe.name
-            )
-
-            if not matched_names:
+        tools = await get_organizers(client, "organizers/tools")
+        self.available_tools: dict[str, dict] = {t["name"].lower(): t for t in tools}
+
+        print(f"Found {len(self.available_tools)} tools in Mealie.\n")
+        return True
+
+    def scan(self, recipe):
+        existing_tool_names = {t["name"] for t in recipe.tools}
+        instruction_text = " ".join(recipe.instructions)
+        return find_matching_tools, (existing_tool_names, instruction_text, recipe.name)
+
+    def apply(self, recipe, matched_names: set[str]) -> dict[str, list]:
+        if not matched_names:
+            return {}
+
+        tools_to_add = []
+        for name in sorted(matched_names):
+            tool = self.available_tools.get(name.lower())
+            if tool is None:
+                print(
+                    f"  ⚠ Tool '{name}' not found in Mealie. "
+                    f"Create it first under Organizer > Tools."
+                )
                 continue
+            tools_to_add.append(tool)
 
-            tools_to_add = []
-            for name in sorted(matched_names):
-                tool = available_tools.get(name.lower())
-                if tool is None:
-                    print(
-                        f"  ⚠ Tool '{name}' not found in Mealie. "
-                        f"Create it first under Organizer > Tools."
-                    )
-                    continue
-                tools_to_add.append(tool)
-
-            if not tools_to_add:
-                continue
+        if not tools_to_add:
+            return {}
+
+        print(
+            f"'{recipe.name}' mentions: "
+            f"{', '.join(t['name'] for t in tools_to_add)}. Adding..."
+        )
+        return {"tools": recipe.tools + tools_to_add}
 
-            print(
-                f"'{recipe.name}' mentions: "
-                f"{', '.join(t.name for t in tools_to_add)}. Adding..."
-            )
-            all_tools = recipe.tools + tools_to_add
-            await client.patch(
-                f"recipes/{recipe.id}",
-                json_data={"tools": [t.to_dict() for t in all_tools]},
-            )
-            updated_count += 1
 
-        print(f"\nDone. Updated {updated_count} recipes.")
+def add_arguments(parser: argparse.ArgumentParser):
+    add_rule_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    await run_rules(client, [ToolsRule()], args)
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(
+        description="Match tool keywords in recipe steps to Mealie tools and assign them."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import os
+import time
+from benchmarks.mock_mealie import MockMealie
+from analysis import BATCH_SIZE, AnalysisPool, run_calls
+from assign_tools import ToolsRule
+from records import RecipeRecord
+from tag_vegetarian import VegetarianRule, food_has_meat_or_fish
+from update_recipe_categories import CategoryRule
+
+
+def build_recipes(count: int, repeat: int) -> list[RecipeRecord]:
+    """Synthetic recipes with their instructions repeated `repeat` times."""
+    mock = MockMealie(count)
+    recipes = []
+    for i in range(count):
+        data = mock.recipe(i)
+        data["recipeInstructions"] = data["recipeInstructions"] * repeat
+        recipes.append(RecipeRecord.from_dict(data))
+    return recipes
+
+
+async def run_pool(pool: AnalysisPool, calls: list[list]) -> list[list]:
+    return await asyncio.gather(*(pool.run(recipe_calls) for recipe_calls in calls))
+
+
+def main(args: argparse.Namespace):
+    recipes = build_recipes(args.recipes, args.repeat)
+    vegetarian = VegetarianRule()
+    vegetarian.meat_foods = {
+        food["id"]: food_has_meat_or_fish(food["name"])
+        for food in MockMealie(1).foods
+    }
+    rules = [ToolsRule(), vegetarian, CategoryRule()]
+    calls = [[rule.scan(recipe) for rule in rules] for recipe in recipes]
+    characters = sum(len(text) for recipe in recipes for text in recipe.instructions)
+    print(
+        f"{len(recipes)} recipes, {characters / len(recipes) / 1024:.1f} KiB of "
+        f"instructions each on average\n"
+    )
+
+    started = time.perf_counter()
+    expected = [run_calls(recipe_calls) for recipe_calls in calls]
+    baseline = time.perf_counter() - started
+    print(f"{'main process':24s} {len(recipes) / baseline:10.0f} recipes/s")
+
+    for workers in args.workers:
+        pool = AnalysisPool(workers, args.batch_size)
+        try:
+            # Start the workers outside the timing
+            asyncio.run(run_pool(pool, calls[: workers * args.batch_size]))
+            started = time.perf_counter()
+            actual = asyncio.run(run_pool(pool, calls))
+            seconds = time.perf_counter() - started
+        finally:
+            pool.close()
+        assert actual == expected, "pool results differ from the main process"
+        print(
+            f"{f'{workers} workers':24s} {len(recipes) / seconds:10.0f} recipes/s "
+            f"({baseline / seconds:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the rules' text matching in the main process against "
+        "AnalysisPool, checking both give the same results."
+    )
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="Repeat each recipe's instructions this many times to simulate a "
+        "large instruction corpus.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, os.cpu_count() or 1}),
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    main(args)
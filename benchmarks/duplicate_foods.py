@@ -0,0 +1,82 @@
+import argparse
+import random
+import time
+from itertools import combinations
+import benchmarks.fixtures  # noqa: F401  (placeholder Mealie settings)
+from find_duplicate_foods import THRESHOLD, find_duplicates, food_names, jaccard, ngrams
+
+BASES: list[str] = [
+    "tomato", "onion", "garlic", "basil", "feta", "olive oil", "white bean",
+    "kale", "lemon", "rosemary", "chicken thigh", "beef mince", "salmon fillet",
+    "mushroom", "cumin", "cinnamon", "rice", "pasta", "potato", "carrot",
+]
+QUALIFIERS: list[str] = [
+    "", "fresh", "dried", "chopped", "roma", "baby", "smoked", "ground", "red",
+    "green", "organic", "canned", "frozen", "sliced", "whole", "large",
+]
+SUFFIXES: list[str] = ["", "s", "es"]
+
+
+def synthetic_foods(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    names: set[str] = set()
+    while len(names) < count:
+        name = " ".join(
+            part
+            for part in (
+                rng.choice(QUALIFIERS),
+                rng.choice(BASES) + rng.choice(SUFFIXES),
+                f"{rng.randrange(count)}" if rng.random() < 0.5 else "",
+            )
+            if part
+        )
+        names.add(name)
+    return [{"id": str(i), "name": name} for i, name in enumerate(sorted(names))]
+
+
+def brute_force(foods: list[dict], threshold: float) -> set[tuple[str, str]]:
+    shingles = [
+        (food["id"], [ngrams(name) for name in food_names(food)]) for food in foods
+    ]
+    pairs = set()
+    for (a, a_sets), (b, b_sets) in combinations(shingles, 2):
+        score = max(jaccard(x, y) for x in a_sets for y in b_sets)
+        if score >= threshold:
+            pairs.add(tuple(sorted((a, b))))
+    return pairs
+
+
+def main(args: argparse.Namespace):
+    print(f"{'Foods':>7s} {'LSH s':>8s} {'Pairs':>8s} {'Brute s':>8s} {'Recall':>7s}")
+    for size in args.sizes:
+        foods = synthetic_foods(size)
+        started = time.perf_counter()
+        found = find_duplicates(foods, args.threshold)
+        lsh_seconds = time.perf_counter() - started
+        line = f"{size:7d} {lsh_seconds:8.2f} {len(found):8d}"
+        if size <= args.brute_force_limit:
+            started = time.perf_counter()
+            expected = brute_force(foods, args.threshold)
+            brute_seconds = time.perf_counter() - started
+            got = {tuple(sorted((keep["id"], absorb["id"]))) for _, keep, absorb in found}
+            recall = len(got & expected) / len(expected) if expected else 1.0
+            line += f" {brute_seconds:8.2f} {recall:7.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time find_duplicate_foods' MinHash/LSH search against "
+        "exhaustive pairwise comparison on synthetic food names."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 8000])
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument(
+        "--brute-force-limit",
+        type=int,
+        default=2000,
+        help="Largest size to also compare exhaustively (default: 2000).",
+    )
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,19 @@
+import datetime
+import os
+from pathlib import Path
+from mealie_client.models.recipe import Recipe
+
+EXAMPLE_RECIPE = Path(__file__).parent.parent / "tests" / "example-recipe.py"
+
+# The scripts read their connection settings from the environment at import
+# time; benchmarks never talk to a real server, so give them placeholders.
+os.environ.setdefault("MEALIE_URL", "http://localhost:9000")
+os.environ.setdefault("API_TOKEN", "benchmark")
+
+
+def load_example_recipe() -> Recipe:
+    """Build the Recipe recorded in tests/example-recipe.py."""
+    return eval(
+        EXAMPLE_RECIPE.read_text(),
+        {"Recipe": Recipe, "datetime": datetime},
+    )
@@ -0,0 +1,390 @@
+import argparse
+import copy
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from benchmarks.fixtures import load_example_recipe
+from assign_tools import TOOL_KEYWORDS
+
+# Sentences appended to the example instructions, one per synthetic recipe in
+# rotation, so tool matching has something different to find in each.
+TOOL_SENTENCES: list[str] = [
+    "Sear everything in a large skillet first.",
+    "Blitz the sauce in a blender until smooth.",
+    "Transfer to a slow cooker and cook on low.",
+    "Whisk the dressing in a mixing bowl.",
+    "",
+]
+# Prefixes that make some recipe names match the CATEGORY_MAP keywords
+MEAL_PREFIXES: list[str] = ["Dinner:", "Lunch:", "Breakfast:", "", "", ""]
+FOOD_NAMES: list[str] = [
+    "tomato", "onion", "garlic", "basil", "feta", "olive oil", "white beans",
+    "kale", "lemon", "rosemary", "chicken", "beef", "salmon", "bacon",
+    "oyster sauce", "mushroom", "cumin", "cinnamon", "rice", "pasta",
+]
+SUMMARY_FIELDS: list[str] = [
+    "id", "userId", "groupId", "householdId", "name", "slug", "image",
+    "recipeServings", "recipeYieldQuantity", "recipeYield", "totalTime",
+    "prepTime", "cookTime", "performTime", "description", "recipeCategory",
+    "tags", "tools", "rating", "orgURL", "dateAdded", "dateUpdated",
+    "createdAt", "updatedAt", "lastMade",
+]
+BASE_DATE = "2025-10-18T23:36:03.143053+00:00"
+
+# The queryFilter expressions the scripts send, as predicates on a recipe
+QUERY_FILTERS = {
+    "recipe_category.id IS NULL": lambda recipe: not recipe["recipeCategory"],
+    "tools.id IS NULL": lambda recipe: not recipe["tools"],
+    "recipe_ingredient.food.id IS NULL": lambda recipe: not recipe["recipeIngredient"]
+    or any(ing.get("food") is None for ing in recipe["recipeIngredient"]),
+}
+
+_ID_RE = re.compile(r"[0-9a-f]{8}-0000-4000-8000-([0-9a-f]{12})")
+_SLUG_RE = re.compile(r"synthetic-recipe-(\d+)")
+
+
+def _organizers(prefix: str, names: list[str]) -> list[dict]:
+    return [
+        {
+            "id": f"{prefix}-{i}",
+            "name": name,
+            "slug": re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-"),
+        }
+        for i, name in enumerate(names)
+    ]
+
+
+class MockMealie:
+    """
+    Local stand-in for the parts of the Mealie API the scripts use, seeded
+    with synthetic recipes derived from tests/example-recipe.py.
+
+    Recipes are generated on demand from their index and only stored once
+    they are patched, so even 100k recipes cost next to no memory. Every
+    request is counted per route in `requests`.
+
+    To exercise retries, `capacity` answers 429 to requests beyond that
+    many in flight, and `error_rate` answers that share of requests with 503.
+    """
+
+    def __init__(
+        self,
+        recipe_count: int = 1000,
+        food_count: int = 500,
+        latency: float = 0.0,
+        capacity: int = 0,
+        error_rate: float = 0.0,
+    ):
+        self.recipe_count = recipe_count
+        self.latency = latency
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.in_flight = 0
+        self._random = random.Random(0)
+        self.template = load_example_recipe().to_dict()
+        self.template["recipeCategory"] = []
+        self.tools = _organizers("tool", sorted(set(TOOL_KEYWORDS.values())))
+        self.oven = next(tool for tool in self.tools if tool["name"] == "Oven")
+        self.tags = _organizers("tag", ["Vegetarian", "Quick", "Family"])
+        self.categories = _organizers("category", ["Dinner", "Lunch", "Breakfast"])
+        self.foods = [
+            {
+                **food,
+                "pluralName": None,
+                "description": "",
+                "extras": {},
+                "labelId": None,
+                "aliases": [],
+            }
+            for food in _organizers(
+                "food",
+                [
+                    FOOD_NAMES[i] if i < len(FOOD_NAMES) else f"food {i}"
+                    for i in range(food_count)
+                ],
+            )
+        ]
+        self.patched: dict[str, dict] = {}
+        # queryFilter -> matching recipe indexes, dropped on every write
+        self.filtered: dict[str, list[int]] = {}
+        self.requests: Counter = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self.server: ThreadingHTTPServer | None = None
+
+    def reset(self):
+        """Forget patches and counters, e.g. between benchmark runs."""
+        with self._lock:
+            self.patched.clear()
+            self.filtered.clear()
+            self.requests.clear()
+            self.bytes_sent = 0
+
+    # Recipes
+
+    def recipe_id(self, index: int) -> str:
+        return f"{index:08x}-0000-4000-8000-{index:012x}"
+
+    def _index(self, recipe_id_or_slug: str) -> int | None:
+        if match := _ID_RE.fullmatch(recipe_id_or_slug):
+            index = int(match.group(1), 16)
+        elif match := _SLUG_RE.fullmatch(recipe_id_or_slug):
+            index = int(match.group(1))
+        else:
+            return None
+        return index if index < self.recipe_count else None
+
+    def recipe(self, index: int) -> dict:
+        recipe_id = self.recipe_id(index)
+        if recipe_id in self.patched:
+            return self.patched[recipe_id]
+
+        recipe = copy.deepcopy(self.template)
+        recipe["id"] = recipe_id
+        recipe["slug"] = f"synthetic-recipe-{index}"
+        prefix = MEAL_PREFIXES[index % len(MEAL_PREFIXES)]
+        recipe["name"] = f"{prefix} {recipe['name']} {index}".strip()
+        recipe["dateUpdated"] = BASE_DATE
+        if index % 3 == 0:
+            recipe["tools"] = [self.oven]
+        if index % 5 == 0:
+            recipe["recipeCategory"] = [self.categories[0]]
+
+        sentence = TOOL_SENTENCES[index % len(TOOL_SENTENCES)]
+        if sentence:
+            recipe["recipeInstructions"].append(
+                {
+                    "id": f"step-{index}",
+                    "title": "",
+                    "summary": "",
+                    "text": sentence,
+                    "ingredientReferences": [],
+                }
+            )
+        # Parse one ingredient for half the recipes, some of them meat
+        if index % 2 == 0:
+            food = self.foods[(index // 2) % len(self.foods)]
+            recipe["recipeIngredient"][0]["food"] = {
+                "id": food["id"],
+                "name": food["name"],
+            }
+        return recipe
+
+    def matching(self, query_filter: str) -> list[int]:
+        if query_filter not in self.filtered:
+            predicate = QUERY_FILTERS[query_filter]
+            self.filtered[query_filter] = [
+                i for i in range(self.recipe_count) if predicate(self.recipe(i))
+            ]
+        return self.filtered[query_filter]
+
+    def summary(self, index: int) -> dict:
+        recipe = self.recipe(index)
+        return {field: recipe.get(field) for field in SUMMARY_FIELDS}
+
+    def patch_recipe(self, index: int, changes: dict) -> dict:
+        with self._lock:
+            recipe = self.recipe(index)
+            recipe.update(changes)
+            recipe["dateUpdated"] = datetime.now(timezone.utc).isoformat()
+            self.patched[recipe["id"]] = recipe
+            self.filtered.clear()
+        return recipe
+
+    def add_organizers(self, index: int, field: str, items: list[dict]):
+        """Bulk actions only ever add, skipping organizers already present."""
+        with self._lock:
+            recipe = self.recipe(index)
+            existing = {item["id"] for item in recipe[field]}
+            recipe[field] = recipe[field] + [
+                item for item in items if item["id"] not in existing
+            ]
+            recipe["dateUpdated"] = datetime.now(timezone.utc).isoformat()
+            self.patched[recipe["id"]] = recipe
+            self.filtered.clear()
+
+    # HTTP
+
+    def _page(self, total: int, item, params: dict[str, list[str]]) -> dict:
+        page = int(params.get("page", ["1"])[0])
+        per_page = int(params.get("perPage", ["50"])[0])
+        start = (page - 1) * per_page
+        return {
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "total_pages": -(-total // per_page),
+            "items": [item(i) for i in range(start, min(start + per_page, total))],
+        }
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests[route] += 1
+
+    def handle(
+        self, method: str, path: str, params: dict, body
+    ) -> tuple[int, object]:
+        parts = path.strip("/").split("/")
+        if parts[:1] != ["api"]:
+            return 404, {"detail": "Not found"}
+        parts = parts[1:]
+
+        if parts == ["recipes"] and method == "GET":
+            if "queryFilter" not in params:
+                self._count("GET recipes")
+                return 200, self._page(self.recipe_count, self.summary, params)
+            query_filter = params["queryFilter"][0]
+            if query_filter not in QUERY_FILTERS:
+                return 400, {"detail": f"Unsupported queryFilter: {query_filter}"}
+            self._count("GET recipes?queryFilter")
+            indexes = self.matching(query_filter)
+            return 200, self._page(
+                len(indexes), lambda i: self.summary(indexes[i]), params
+            )
+        if parts[:2] == ["recipes", "bulk-actions"] and method == "POST":
+            # action -> (payload key, recipe field)
+            action = {
+                "tag": ("tags", "tags"),
+                "categorize": ("categories", "recipeCategory"),
+            }.get(parts[2] if len(parts) == 3 else "")
+            if action is not None:
+                self._count(f"POST recipes/bulk-actions/{parts[2]}")
+                key, field = action
+                for slug in body["recipes"]:
+                    if (index := self._index(slug)) is not None:
+                        self.add_organizers(index, field, body[key])
+                return 200, {"success": True}
+        if len(parts) == 2 and parts[0] == "recipes":
+            index = self._index(parts[1])
+            if index is None:
+                return 404, {"detail": "Recipe not found"}
+            if method == "GET":
+                self._count("GET recipes/{id}")
+                return 200, self.recipe(index)
+            if method == "PATCH":
+                self._count("PATCH recipes/{id}")
+                return 200, self.patch_recipe(index, body or {})
+
+        if parts[:1] == ["organizers"] and len(parts) == 2 and method == "GET":
+            items = {
+                "tools": self.tools,
+                "tags": self.tags,
+                "categories": self.categories,
+            }.get(parts[1])
+            if items is not None:
+                self._count(f"GET organizers/{parts[1]}")
+                return 200, self._page(len(items), items.__getitem__, params)
+
+        if parts == ["foods"] and method == "GET":
+            self._count("GET foods")
+            return 200, self._page(len(self.foods), self.foods.__getitem__, params)
+        if parts == ["foods", "merge"] and method == "PUT":
+            self._count("PUT foods/merge")
+            with self._lock:
+                ids = {food["id"] for food in self.foods}
+                if not {body["fromFood"], body["toFood"]} <= ids:
+                    return 404, {"detail": "Food not found"}
+                self.foods = [f for f in self.foods if f["id"] != body["fromFood"]]
+            return 200, {"message": "Foods merged"}
+        if len(parts) == 2 and parts[0] == "foods" and method == "PUT":
+            self._count("PUT foods/{id}")
+            for i, food in enumerate(self.foods):
+                if food["id"] == parts[1]:
+                    self.foods[i] = {**food, **(body or {}), "id": food["id"]}
+                    return 200, self.foods[i]
+            return 404, {"detail": "Food not found"}
+
+        return 404, {"detail": "Not found"}
+
+    def start(self, port: int = 0) -> str:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _dispatch(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length)) if length else None
+                with mock._lock:
+                    mock.in_flight += 1
+                    overloaded = mock.capacity and mock.in_flight > mock.capacity
+                    failed = mock._random.random() < mock.error_rate
+                try:
+                    if mock.latency:
+                        time.sleep(mock.latency)
+                    if overloaded:
+                        mock._count("429")
+                        status, payload = 429, {"detail": "Too many requests"}
+                    elif failed:
+                        mock._count("503")
+                        status, payload = 503, {"detail": "Service unavailable"}
+                    else:
+                        status, payload = mock.handle(
+                            self.command, url.path, parse_qs(url.query), body
+                        )
+                finally:
+                    with mock._lock:
+                        mock.in_flight -= 1
+                data = json.dumps(payload).encode()
+                with mock._lock:
+                    mock.bytes_sent += len(data)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_PATCH = do_PUT = do_POST = do_DELETE = _dispatch
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in Mealie API seeded with synthetic recipes."
+    )
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--foods", type=int, default=500)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every response."
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=0,
+        help="Answer 429 beyond this many requests in flight (default: no limit).",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests answered 503."
+    )
+    args = parser.parse_args()
+
+    mock = MockMealie(
+        args.recipes, args.foods, args.latency, args.capacity, args.error_rate
+    )
+    url = mock.start(args.port)
+    print(f"Serving mock Mealie with {args.recipes} recipes at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        mock.stop()
+        print(dict(mock.requests))
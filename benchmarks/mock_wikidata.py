@@ -0,0 +1,140 @@
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# label -> entity, used when no --data file is given
+SAMPLE_ENTITIES: dict[str, dict] = {
+    "tomato": {
+        "qid": "Q23501",
+        "description": "edible berry of the tomato plant",
+        "aliases": ["tomatoes", "love apple"],
+    },
+    "basil": {
+        "qid": "Q38859",
+        "description": "species of plant, culinary herb",
+        "aliases": ["great basil", "sweet basil"],
+    },
+    "feta": {
+        "qid": "Q188469",
+        "description": "brined curd white cheese from Greece",
+        "aliases": ["feta cheese"],
+    },
+}
+
+_VALUES_RE = re.compile(r"VALUES\s+\?label\s*\{(.*?)\}", re.DOTALL)
+_LITERAL_RE = re.compile(r'"((?:[^"\\]|\\.)*)"@en')
+_ECHAR_RE = re.compile(r"\\(.)")
+_ECHARS = {"n": "\n", "r": "\r", "t": "\t"}
+
+
+def _bindings(label: str, entity: dict) -> list[dict]:
+    base = {
+        "label": {"type": "literal", "xml:lang": "en", "value": label},
+        "item": {
+            "type": "uri",
+            "value": f"http://www.wikidata.org/entity/{entity['qid']}",
+        },
+        "itemDescription": {
+            "type": "literal",
+            "xml:lang": "en",
+            "value": entity["description"],
+        },
+    }
+    if not entity["aliases"]:
+        return [base]
+    return [
+        {**base, "alias": {"type": "literal", "xml:lang": "en", "value": alias}}
+        for alias in entity["aliases"]
+    ]
+
+
+class MockWikidata:
+    """
+    Local stand-in for query.wikidata.org that answers the VALUES-based food
+    lookup query from `wikidata.py` out of an in-memory label table.
+    """
+
+    def __init__(self, entities: dict[str, dict] = SAMPLE_ENTITIES, latency: float = 0.0):
+        # Labels and aliases both resolve to the entity, like rdfs:label|skos:altLabel
+        self.labels: dict[str, dict] = {}
+        for label, entity in entities.items():
+            self.labels[label] = entity
+            for alias in entity["aliases"]:
+                self.labels.setdefault(alias, entity)
+        self.latency = latency
+        self.queries = 0
+        self.server: ThreadingHTTPServer | None = None
+
+    def answer(self, query: str) -> dict:
+        self.queries += 1
+        bindings = []
+        values = _VALUES_RE.search(query)
+        for literal in _LITERAL_RE.findall(values.group(1) if values else ""):
+            label = _ECHAR_RE.sub(lambda m: _ECHARS.get(m[1], m[1]), literal)
+            if label in self.labels:
+                bindings.extend(_bindings(label, self.labels[label]))
+        return {
+            "head": {"vars": ["label", "item", "alias", "itemDescription"]},
+            "results": {"bindings": bindings},
+        }
+
+    def start(self, port: int = 0) -> str:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, params: dict[str, list[str]]):
+                time.sleep(mock.latency)
+                body = json.dumps(mock.answer(params.get("query", [""])[0])).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/sparql-results+json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(parse_qs(urlparse(self.path).query))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._respond(parse_qs(self.rfile.read(length).decode()))
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}/sparql"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the Wikidata SPARQL endpoint."
+    )
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument(
+        "--data",
+        help="JSON file mapping labels to {qid, description, aliases}.",
+    )
+    args = parser.parse_args()
+
+    entities = SAMPLE_ENTITIES
+    if args.data:
+        with open(args.data) as f:
+            entities = json.load(f)
+    mock = MockWikidata(entities, latency=args.latency)
+    url = mock.start(args.port)
+    print(f"Serving mock Wikidata at {url}; set WIKIDATA_SPARQL_URL to use it.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        mock.stop()
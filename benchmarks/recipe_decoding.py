@@ -0,0 +1,102 @@
+import argparse
+import json
+import time
+import timeit
+from mealie_client.models.common import (
+    RecipeCategory,
+    RecipeInstruction,
+    RecipeTag,
+    RecipeTool,
+)
+from mealie_client.models.recipe import Recipe
+from benchmarks.mock_mealie import MockMealie
+from records import RecipeRecord
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def models_path(body: bytes) -> dict:
+    """What a recipe cost before: full models, organizers converted both ways."""
+    recipe = Recipe.from_dict(json.loads(body))
+    tools = [RecipeTool.from_dict(t) for t in recipe.tools]
+    tags = [RecipeTag.from_dict(t) for t in recipe.tags]
+    categories = [RecipeCategory.from_dict(c) for c in recipe.recipe_category]
+    [RecipeInstruction.from_dict(s) for s in recipe.recipeInstructions]
+    return {
+        "tools": [t.to_dict() for t in tools],
+        "tags": [t.to_dict() for t in tags],
+        "recipeCategory": [c.to_dict() for c in categories],
+    }
+
+
+def records_path(body: bytes, loads=json.loads) -> dict:
+    """The raw-dict path: a compact record, organizers passed straight through."""
+    recipe = RecipeRecord.from_dict(loads(body))
+    return {
+        "tools": recipe.tools,
+        "tags": recipe.tags,
+        "recipeCategory": recipe.recipe_category,
+    }
+
+
+def main(args: argparse.Namespace):
+    mock = MockMealie(args.recipes)
+    bodies = [json.dumps(mock.recipe(i)).encode() for i in range(args.recipes)]
+    print(
+        f"{len(bodies)} recipe responses, "
+        f"{sum(map(len, bodies)) / len(bodies) / 1024:.1f} KiB each on average\n"
+    )
+
+    # Same organizer ids either way; the models only add their own fields
+    for body in bodies:
+        before, after = models_path(body), records_path(body)
+        for field, items in before.items():
+            assert [i["id"] for i in items] == [i["id"] for i in after[field]]
+
+    paths = [
+        ("models (json)", models_path),
+        ("records (json)", records_path),
+    ]
+    if orjson is not None:
+        paths.append(
+            ("records (orjson)", lambda body: records_path(body, orjson.loads))
+        )
+    else:
+        print("orjson is not installed; skipping the FAST_JSON path.\n")
+
+    baseline = None
+    for label, path in paths:
+        seconds = min(
+            timeit.repeat(
+                lambda: [path(body) for body in bodies],
+                timer=time.process_time,
+                number=args.number,
+                repeat=5,
+            )
+        )
+        per_recipe = seconds / args.number / len(bodies) * 1e6
+        baseline = baseline or per_recipe
+        print(
+            f"{label:20s} {per_recipe:10.1f} µs CPU per recipe "
+            f"({baseline / per_recipe:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the CPU cost per recipe of decoding into models and "
+        "converting organizers against compact records with raw dicts."
+    )
+    parser.add_argument(
+        "--recipes",
+        type=int,
+        default=30,
+        help="Distinct synthetic recipes to decode per round.",
+    )
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,106 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.mock_mealie import MockMealie
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Tools run back to back, as separate processes and chained in main.py
+CHAIN: list[str] = [
+    "list_recipes_without_categories",
+    "update_recipe_categories",
+    "tag_vegetarian",
+]
+
+
+def wall_time(commands: list[list[str]], env: dict[str, str]) -> float:
+    started = time.perf_counter()
+    for command in commands:
+        subprocess.run(
+            [sys.executable, *command],
+            cwd=REPO_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+    return time.perf_counter() - started
+
+
+def measure(
+    label: str, commands: list[list[str]], env: dict[str, str], repeat: int, reset=None
+):
+    timings = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        timings.append(wall_time(commands, env))
+    print(
+        f"{label:48s} {statistics.median(timings) * 1000:9.0f} ms "
+        f"(min {min(timings) * 1000:.0f})"
+    )
+
+
+def main(args: argparse.Namespace):
+    mock = MockMealie(args.recipes)
+    url = mock.start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "MEALIE_URL": url,
+                "API_TOKEN": "benchmark",
+                "SNAPSHOT_PATH": str(Path(tmp) / "snapshot.sqlite3"),
+            }
+
+            def reset():
+                mock.reset()
+                Path(env["SNAPSHOT_PATH"]).unlink(missing_ok=True)
+
+            print(f"{'Command':48s} {'Median':>12s}")
+            measure("main.py --help", [["main.py", "--help"]], env, args.repeat)
+            measure(
+                "main.py maintain --help",
+                [["main.py", "maintain", "--help"]],
+                env,
+                args.repeat,
+            )
+            measure(
+                "maintain.py --help", [["maintain.py", "--help"]], env, args.repeat
+            )
+            measure(
+                f"{len(CHAIN)} scripts, one process each",
+                [[f"{name}.py"] for name in CHAIN],
+                env,
+                args.repeat,
+                reset,
+            )
+            measure(
+                f"{len(CHAIN)} tools chained in main.py",
+                [["main.py", *[arg for name in CHAIN for arg in ("+", name)][1:]]],
+                env,
+                args.repeat,
+                reset,
+            )
+    finally:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure CLI startup and chained runs against a mock Mealie."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--recipes",
+        type=int,
+        default=100,
+        help="Recipes in the mock library; keep it small to isolate startup.",
+    )
+    args = parser.parse_args()
+
+    main(args)
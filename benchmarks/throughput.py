@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.mock_mealie import MockMealie
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Script name -> extra arguments
+SCRIPTS: dict[str, list[str]] = {
+    "list_unparsed_recipes": [],
+    "list_recipes_without_categories": [],
+    "list_missing_tools": [],
+    "assign_tools": [],
+    "tag_vegetarian": [],
+    "update_recipe_categories": [],
+    "maintain": [],
+}
+SIZES = [1000, 10000, 100000]
+
+
+def run_script(
+    script: str, extra_args: list[str], env: dict[str, str], trace: Path
+) -> tuple[float, float]:
+    """Run one script to completion; return wall time and peak RSS in MiB."""
+    with tempfile.TemporaryFile() as stderr:
+        started = time.perf_counter()
+        # The peak comes from the script's own profile: the rusage wait4
+        # reports also counts this process, mock library included, as it
+        # was when the script was spawned
+        process = subprocess.run(
+            [
+                sys.executable,
+                str(REPO_ROOT / f"{script}.py"),
+                *extra_args,
+                "--profile",
+                str(trace),
+            ],
+            cwd=REPO_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+        elapsed = time.perf_counter() - started
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"{script} failed:\n{stderr.read().decode()}")
+    with open(trace) as f:
+        *_, run = f
+    return elapsed, json.loads(run)["peak_rss_mib"]
+
+
+def main(args: argparse.Namespace):
+    scripts = args.scripts or list(SCRIPTS)
+    print(
+        f"{'Script':32s} {'Recipes':>8s} {'Seconds':>8s} {'Recipes/s':>10s} "
+        f"{'Requests':>9s} {'MiB sent':>9s} {'Peak RSS':>9s}"
+    )
+    print("-" * 92)
+    for size in args.sizes:
+        mock = MockMealie(
+            size,
+            latency=args.latency,
+            capacity=args.capacity,
+            error_rate=args.error_rate,
+        )
+        url = mock.start()
+        try:
+            for script in scripts:
+                mock.reset()
+                with tempfile.TemporaryDirectory() as tmp:
+                    env = {
+                        **os.environ,
+                        "MEALIE_URL": url,
+                        "API_TOKEN": "benchmark",
+                        "SNAPSHOT_PATH": str(Path(tmp) / "snapshot.sqlite3"),
+                    }
+                    elapsed, peak_rss = run_script(
+                        script, SCRIPTS[script], env, Path(tmp) / "profile.jsonl"
+                    )
+                requests = sum(mock.requests.values())
+                print(
+                    f"{script:32s} {size:8d} {elapsed:8.2f} {size / elapsed:10.1f} "
+                    f"{requests:9d} {mock.bytes_sent / 2**20:9.1f} "
+                    f"{peak_rss:6.1f} MiB"
+                )
+                if args.verbose:
+                    for route, count in sorted(mock.requests.items()):
+                        print(f"    {route:40s} {count:8d}")
+        finally:
+            mock.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run each recipe script against a mock Mealie server and "
+        "report throughput, request counts and peak memory."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="Library sizes to seed the mock server with (default: 1k 10k 100k).",
+    )
+    parser.add_argument(
+        "--scripts",
+        nargs="+",
+        choices=list(SCRIPTS),
+        help="Scripts to run (default: all).",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every response."
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=0,
+        help="Mock answers 429 beyond this many requests in flight.",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests answered 503."
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show request counts per route."
+    )
+    args = parser.parse_args()
+
+    main(args)
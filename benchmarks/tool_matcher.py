@@ -0,0 +1,69 @@
+import argparse
+import re
+import timeit
+from benchmarks.fixtures import load_example_recipe
+from assign_tools import TOOL_KEYWORDS, find_matching_tools
+from records import RecipeRecord
+
+
+def find_matching_tools_loop(
+    recipe_tool_names: set[str],
+    instruction_text: str,
+    recipe_name: str,
+) -> set[str]:
+    """The original one-re.search-per-pattern implementation, for reference."""
+    matched = set()
+    text_to_search = f"{recipe_name} {instruction_text}".lower()
+
+    for pattern, tool_name in TOOL_KEYWORDS.items():
+        if re.search(pattern, text_to_search, re.IGNORECASE):
+            matched.add(tool_name)
+
+    return matched - recipe_tool_names
+
+
+# Overlapping keywords that start at the same word must all be found.
+SAMPLES: list[str] = [
+    "Preheat the toaster oven, then use a dutch oven and a slow cooker.",
+    "Blend with an immersion blender or a Crock-Pot; sauté in a frying pan.",
+]
+
+
+def main(args: argparse.Namespace):
+    recipe = RecipeRecord.from_dict(load_example_recipe().to_dict())
+    instructions = " ".join(recipe.instructions)
+    for text in [instructions, *SAMPLES]:
+        expected = find_matching_tools_loop(set(), text, recipe.name)
+        actual = find_matching_tools(set(), text, recipe.name)
+        assert actual == expected, (text, expected ^ actual)
+
+    text = " ".join([instructions] * args.repeat)
+    print(f"Instruction text: {len(text)} characters\n")
+    for label, matcher in [
+        ("re.search loop", find_matching_tools_loop),
+        ("compiled matcher", find_matching_tools),
+    ]:
+        seconds = min(
+            timeit.repeat(
+                lambda: matcher(set(), text, recipe.name),
+                number=args.number,
+                repeat=5,
+            )
+        )
+        print(f"{label:20s} {seconds / args.number * 1e6:10.1f} µs per recipe")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare find_matching_tools against the per-pattern re.search loop."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Repeat the example instructions this many times to simulate longer recipes.",
+    )
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import time
+from collections.abc import Awaitable, Callable
+from common import CHECKPOINT_DIR
+
+# Seconds between checkpoint writes
+SAVE_EVERY = 10.0
+
+
+class Checkpoint:
+    """
+    Progress of a long scan, so an interrupted run can pick up where it
+    stopped: the ids already handled, and for paginated scans the last page
+    whose items were all handled.
+
+    The file is rewritten atomically every `save_every` seconds and removed
+    once the scan completes. Only report an id as handled once its writes
+    have reached the server; a writer that buffers them reports its ids
+    after sending. `before_save` runs before writing, e.g. to send those
+    buffers, but the state saved is the one from before it ran: ids handled
+    while it waits are saved next time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        save_every: float = SAVE_EVERY,
+        before_save: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.path = path
+        self.save_every = save_every
+        self.before_save = before_save
+        self.done: set[str] = set()
+        self.last_page = 0
+        self.per_page: int | None = None
+        self.total: int | None = None
+        self.resumed = 0
+        self._pages: dict[str, int] = {}  # listed, not yet handled id -> page
+        self._remaining: dict[int, int] = {}  # page -> ids not yet handled
+        self._listed_page = 0
+        self._listing_done = False
+        self._saved_at = time.monotonic()
+        self._saving = False
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        self.done = set(state["done"])
+        self.last_page = state.get("last_page", 0)
+        self.per_page = state.get("per_page")
+        self.total = state.get("total")
+        self.resumed = len(self.done)
+
+    async def start_page(
+        self, client, endpoint: str, params: dict | None, per_page: int
+    ) -> int:
+        """
+        Page to resume listing from. Falls back to page 1 (still skipping the
+        handled ids) if items were added or removed since the checkpoint, as
+        that shifts them between pages. Only a checkpoint with pages to skip
+        asks Mealie for the current total; otherwise the listing reports it
+        through `listing_total`.
+        """
+        if not self.last_page:
+            self.per_page = per_page
+            return 1
+        first = await client.get(
+            endpoint, params={**(params or {}), "page": 1, "perPage": 1}
+        )
+        total = first.get("total") if isinstance(first, dict) else None
+        if (per_page, total) != (self.per_page, self.total):
+            print(
+                "⚠ Items changed since the checkpoint; listing from the first "
+                "page, skipping those already handled."
+            )
+            self.last_page = 0
+        self.per_page, self.total = per_page, total
+        self._listed_page = self.last_page
+        return self.last_page + 1
+
+    def listing_total(self, total: int | None):
+        if self.total is None:
+            self.total = total
+
+    def listed(self, item_id: str, page: int) -> bool:
+        """Note an item listed on `page`; False if it was already handled."""
+        if page > self._listed_page:
+            self._listed_page = page
+            self._advance()
+        if item_id in self.done:
+            return False
+        self._pages[item_id] = page
+        self._remaining[page] = self._remaining.get(page, 0) + 1
+        return True
+
+    def listing_finished(self):
+        self._listing_done = True
+        self._advance()
+
+    async def handled(self, item_id: str):
+        self.done.add(item_id)
+        if (page := self._pages.pop(item_id, None)) is not None:
+            self._remaining[page] -= 1
+            self._advance()
+        if time.monotonic() - self._saved_at >= self.save_every:
+            await self.save()
+
+    def _advance(self):
+        # A page is complete once a later page is being listed (or listing
+        # is over) and none of its items are outstanding
+        while self.last_page < self._listed_page - (not self._listing_done):
+            if self._remaining.get(self.last_page + 1, 0):
+                break
+            self._remaining.pop(self.last_page + 1, None)
+            self.last_page += 1
+
+    async def save(self, final: bool = False):
+        """
+        Write the progress so far. The state is the one from before
+        `before_save` ran, and is written even if `before_save` fails; its
+        error is then raised, or with `final` (the run is stopping anyway)
+        only reported.
+        """
+        if self._saving:
+            return
+        self._saving = True
+        try:
+            state = {
+                "last_page": self.last_page,
+                "per_page": self.per_page,
+                "total": self.total,
+                "done": sorted(self.done),
+            }
+            error = None
+            if self.before_save is not None:
+                try:
+                    await self.before_save()
+                except Exception as e:
+                    error = e
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._saved_at = time.monotonic()
+            if error is not None:
+                if not final:
+                    raise error
+                print(f"⚠ Could not send the buffered changes: {error}")
+        finally:
+            self._saving = False
+
+    def finish(self):
+        """The scan completed: the next run starts from scratch."""
+        for path in (self.path, f"{self.path}.tmp"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def add_checkpoint_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint instead of "
+        "starting over.",
+    )
+
+
+def open_checkpoint(
+    args: argparse.Namespace,
+    name: str,
+    before_save: Callable[[], Awaitable[None]] | None = None,
+) -> Checkpoint:
+    checkpoint = Checkpoint(
+        os.path.join(CHECKPOINT_DIR, f"checkpoint-{name}.json"),
+        before_save=before_save,
+    )
+    if getattr(args, "resume", False):
+        checkpoint.load()
+        if checkpoint.resumed:
+            print(f"Resuming: {checkpoint.resumed} already handled.")
+    return checkpoint
@@ -1,11 +1,29 @@
+import argparse
 import os
 import ssl
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from mealie_client import MealieClient
+
 load_dotenv()
 
 BASE_URL = os.getenv("MEALIE_URL")
 API_TOKEN = os.getenv("API_TOKEN")
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "snapshot.sqlite3")
+# Progress of interrupted runs, next to the snapshot unless set
+CHECKPOINT_DIR = os.getenv(
+    "CHECKPOINT_DIR", os.path.dirname(os.path.abspath(SNAPSHOT_PATH))
+)
+WIKIDATA_CACHE_PATH = os.getenv("WIKIDATA_CACHE_PATH", "wikidata_cache.sqlite3")
+WIKIDATA_SPARQL_URL = os.getenv(
+    "WIKIDATA_SPARQL_URL", "https://query.wikidata.org/sparql"
+)
+# Decode Mealie responses and snapshot rows with orjson, when installed
+FAST_JSON = os.getenv("FAST_JSON", "0") == "1"
 
 if not BASE_URL or not API_TOKEN:
     print("Missing environment variables: MEALIE_URL and/or API_TOKEN")
@@ -14,3 +32,30 @@ if not BASE_URL or not API_TOKEN:
 if os.getenv("SSL_VERIFY", "1") == "0":
     ssl._create_default_https_context = ssl._create_unverified_context
     ssl.create_default_context = lambda *args, **kwargs: ssl._create_unverified_context()
+
+
+@asynccontextmanager
+async def mealie_session(
+    args: argparse.Namespace | None = None,
+) -> AsyncIterator["MealieClient"]:
+    """
+    A Mealie client whose requests go through the host's governor and, with
+    FAST_JSON, orjson. With `args`, the block is also profiled as their
+    --profile asks.
+    """
+    # Imported here so the offline tools start without the client
+    from mealie_client import MealieClient
+    from fast_json import fast_json
+    from governor import governed
+    from profiling import profiling
+
+    async with (
+        MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client,
+        governed(client),
+        fast_json(client),
+    ):
+        if args is None:
+            yield client
+        else:
+            async with profiling(args, client):
+                yield client
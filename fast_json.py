@@ -0,0 +1,55 @@
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from common import FAST_JSON
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if FAST_JSON and orjson is None:
+    print("⚠ FAST_JSON is set but orjson is not installed; using the json module.")
+
+_enabled = FAST_JSON and orjson is not None
+
+
+def loads(data: str | bytes):
+    return orjson.loads(data) if _enabled else json.loads(data)
+
+
+def dumps(obj) -> str:
+    return orjson.dumps(obj).decode() if _enabled else json.dumps(obj)
+
+
+@asynccontextmanager
+async def fast_json(client) -> AsyncIterator[None]:
+    """
+    With FAST_JSON=1 and orjson installed, decode `client`'s successful JSON
+    responses with orjson for the duration of the block. Anything orjson
+    rejects goes to the client's own handling, which reports it.
+    """
+    if not _enabled:
+        yield
+        return
+    handle_response = client._handle_response
+    saved = client.__dict__.get("_handle_response")
+
+    async def decode_response(response, request_id):
+        if 200 <= response.status_code < 300 and response.headers.get(
+            "content-type", ""
+        ).startswith("application/json"):
+            try:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                pass
+        return await handle_response(response, request_id)
+
+    client._handle_response = decode_response
+    try:
+        yield
+    finally:
+        if saved is None:
+            del client._handle_response
+        else:
+            client._handle_response = saved
@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import csv
+import random
+import re
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from common import mealie_session
+from pagination import paginate
+from profiling import add_profile_arguments, profiled
+
+NGRAM = 3
+# MinHash signature length and LSH bands. With 21 bands of 3 rows, names
+# with an n-gram Jaccard similarity of 0.5 become candidates ~93% of the
+# time, and of 0.6 over 99%.
+NUM_HASHES = 63
+BANDS = 21
+THRESHOLD = 0.5
+OUTPUT_PATH = "duplicate_foods.csv"
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0)
+_HASH_PARAMS: list[tuple[int, int]] = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(NUM_HASHES)
+]
+_NON_WORD_RE = re.compile(r"\W+")
+
+
+def normalize(name: str) -> str:
+    return " ".join(_NON_WORD_RE.sub(" ", name.casefold()).split())
+
+
+def ngrams(name: str, n: int = NGRAM) -> set[str]:
+    padded = f" {normalize(name)} "
+    return {padded[i : i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+def minhash(shingles: set[str]) -> list[int]:
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _HASH_PARAMS]
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def candidate_pairs(
+    signatures: list[list[int]], bands: int = BANDS
+) -> set[tuple[int, int]]:
+    """Index pairs whose signatures agree on at least one whole band."""
+    rows = len(signatures[0]) // bands if signatures else 0
+    pairs: set[tuple[int, int]] = set()
+    for band in range(bands):
+        buckets: dict[tuple[int, ...], list[int]] = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            buckets[tuple(signature[band * rows : (band + 1) * rows])].append(i)
+        for members in buckets.values():
+            pairs.update(combinations(members, 2))
+    return pairs
+
+
+def food_names(food: dict) -> set[str]:
+    """A food's name, plural and aliases, normalized."""
+    names = {food.get("name"), food.get("pluralName")}
+    names.update(alias.get("name") for alias in food.get("aliases") or [])
+    return {normalize(name) for name in names if name and normalize(name)}
+
+
+@profiled
+def find_duplicates(
+    foods: list[dict], threshold: float = THRESHOLD
+) -> list[tuple[float, dict, dict]]:
+    """
+    Rank likely duplicate foods as (score, keep, absorb), best first.
+
+    Every name and alias is MinHashed and bucketed by LSH band, so only
+    names sharing a band are compared exactly; the score is the best n-gram
+    Jaccard similarity between any name of one food and any of the other.
+    The food with the shorter name is kept.
+    """
+    owners: list[int] = []
+    shingle_sets: list[set[str]] = []
+    for index, food in enumerate(foods):
+        for name in food_names(food):
+            owners.append(index)
+            shingle_sets.append(ngrams(name))
+
+    signatures = [minhash(shingles) for shingles in shingle_sets]
+    best: dict[tuple[int, int], float] = {}
+    for i, j in candidate_pairs(signatures):
+        a, b = sorted((owners[i], owners[j]))
+        if a == b:
+            continue
+        score = jaccard(shingle_sets[i], shingle_sets[j])
+        if score > best.get((a, b), 0.0):
+            best[(a, b)] = score
+
+    ranked = []
+    for (a, b), score in best.items():
+        if score < threshold:
+            continue
+        keep, absorb = sorted(
+            (foods[a], foods[b]), key=lambda food: (len(food["name"]), food["name"])
+        )
+        ranked.append((score, keep, absorb))
+    ranked.sort(key=lambda pair: (-pair[0], pair[1]["name"], pair[2]["name"]))
+    return ranked
+
+
+def write_pairs(path: str, pairs: list[tuple[float, dict, dict]]):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["keep", "absorb", "score"])
+        for score, keep, absorb in pairs:
+            writer.writerow([keep["name"], absorb["name"], f"{score:.3f}"])
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help=f"Minimum n-gram similarity to report (default: {THRESHOLD}).",
+    )
+    parser.add_argument(
+        "--output",
+        default=OUTPUT_PATH,
+        help=f"CSV of keep,absorb,score pairs (default: {OUTPUT_PATH}).",
+    )
+    add_profile_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    print("Fetching all foods from Mealie…")
+    foods = [item async for item in paginate(client, "foods")]
+    print(f"Comparing {len(foods)} foods…")
+
+    pairs = find_duplicates(foods, args.threshold)
+    for score, keep, absorb in pairs[:10]:
+        print(f"  {score:.2f}  keep '{keep['name']}', absorb '{absorb['name']}'")
+    if len(pairs) > 10:
+        print(f"  … and {len(pairs) - 10} more")
+
+    write_pairs(args.output, pairs)
+    print(
+        f"\nDone. Wrote {len(pairs)} candidate merges to {args.output}; review "
+        "them before passing the file to merge_ingredients.py."
+    )
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Find likely duplicate foods and write ranked merge candidates."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
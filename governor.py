@@ -0,0 +1,308 @@
+import asyncio
+import email.utils
+import random
+import time
+import urllib.error
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+from mealie_client.exceptions import ConnectionError as MealieConnectionError
+from mealie_client.exceptions import MealieAPIError
+from mealie_client.exceptions import TimeoutError as MealieTimeoutError
+from profiling import route
+
+T = TypeVar("T")
+
+# Requests in flight per host: where the limit starts and the range AIMD
+# moves it in
+INITIAL_LIMIT = 8
+MIN_LIMIT = 1
+MAX_LIMIT = 32
+# When a route's recent latency (fast moving average) exceeds this multiple
+# of its usual latency (slow moving average), the server is taken to be
+# queueing and the limit shrinks, as it does on a 429
+LATENCY_TOLERANCE = 2.0
+# Usual latencies below this are compared as if they were this: a few
+# milliseconds of scheduling noise on a fast server is not queueing
+LATENCY_FLOOR = 0.005
+SHORT_SMOOTHING = 0.2
+LONG_SMOOTHING = 0.02
+DECREASE_FACTOR = 0.7
+OVERLOAD_FACTOR = 0.5
+# Latency only counts once a route has this many samples, and on its own
+# never takes the limit below where it started. Time the event
+# loop spends blocked on local work (decoding, snapshot reads, analysis)
+# while a request is out is taken off its latency: it is measured by waking
+# every STALL_TICK seconds and adding up lateness beyond STALL_SLACK.
+MIN_SAMPLES = 20
+STALL_TICK = 0.01
+STALL_SLACK = 0.002
+
+# Status codes worth retrying, and the jittered exponential backoff between
+# attempts: a random wait of up to BACKOFF_BASE * 2^attempt, capped
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+# Routes that must not be sent twice: once the server may have applied one,
+# it is only retried after a 429 or a refused connection. A merge replayed
+# after the food is gone fails with a 404.
+NON_IDEMPOTENT_ROUTES = {"PUT foods/merge"}
+
+def backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, in bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Governor:
+    """
+    Adaptive concurrency limit and retries for the requests to one host.
+
+    The limit grows by one per limit's worth of healthy responses and is
+    cut multiplicatively when a response is throttled (429), fails (5xx,
+    connection errors) or takes well over its route's usual latency, at most
+    once per round trip. Latency leaves out the time the event loop was
+    stalled, so local CPU work does not pass for a queueing server, and
+    cannot cut below the initial limit. Transient failures are retried
+    after a jittered exponential backoff. With a `rate`, a token bucket also
+    spaces out request starts.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = INITIAL_LIMIT,
+        min_limit: int = MIN_LIMIT,
+        max_limit: int = MAX_LIMIT,
+        rate: float | None = None,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.initial = self.limit
+        self.bucket = TokenBucket(rate) if rate else None
+        self.max_retries = max_retries
+        self.in_flight = 0
+        # key -> (recent, usual) latency in seconds, and samples seen
+        self.latencies: dict[str, tuple[float, float, int]] = {}
+        # Seconds the event loop has been stalled while requests were out
+        self.stalled = 0.0
+        self._watcher: asyncio.Task | None = None
+        self.retries = 0
+        self.decreases = 0
+        self.peak_limit = self.limit
+        self._decreased_at = 0.0
+        self._changed = asyncio.Condition()
+
+    async def run(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[T]],
+        retry_after: Callable[[Exception], float | None],
+    ) -> T:
+        """
+        Await `call()` within the limit, retrying while `retry_after(error)`
+        says the error is transient (returning the server's requested delay,
+        or 0). `key` groups calls with comparable latency.
+        """
+        attempt = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: self.in_flight < int(self.limit)
+                )
+                self.in_flight += 1
+                if self._watcher is None or self._watcher.done():
+                    self._watcher = asyncio.create_task(self._watch_stalls())
+            delay = None
+            try:
+                if self.bucket is not None:
+                    await self.bucket.acquire()
+                started, stalled = time.monotonic(), self.stalled
+                try:
+                    result = await call()
+                except Exception as e:
+                    delay = retry_after(e)
+                    if delay is None:
+                        self._observe(key, started, stalled)
+                        raise
+                    self._decrease(OVERLOAD_FACTOR)
+                    if attempt >= self.max_retries:
+                        raise
+                    print(f"⚠ {key}: {e}; retrying (attempt {attempt + 2}).")
+                else:
+                    self._observe(key, started, stalled)
+                    return result
+            finally:
+                async with self._changed:
+                    self.in_flight -= 1
+                    self._changed.notify_all()
+            self.retries += 1
+            await asyncio.sleep(max(delay, backoff(attempt)))
+            attempt += 1
+
+    async def _watch_stalls(self):
+        while self.in_flight:
+            started = time.monotonic()
+            await asyncio.sleep(STALL_TICK)
+            late = time.monotonic() - started - STALL_TICK
+            if late > STALL_SLACK:
+                self.stalled += late
+
+    def _observe(self, key: str, started: float, stalled: float):
+        seconds = max(0.0, time.monotonic() - started - (self.stalled - stalled))
+        recent, usual, samples = self.latencies.get(key, (seconds, seconds, 0))
+        recent += (seconds - recent) * SHORT_SMOOTHING
+        # The usual latency follows too, slowly, so a server that got slower
+        # for good is not throttled forever
+        usual += (seconds - usual) * LONG_SMOOTHING
+        samples += 1
+        self.latencies[key] = (recent, usual, samples)
+        baseline = max(usual, LATENCY_FLOOR)
+        if samples >= MIN_SAMPLES and recent > baseline * LATENCY_TOLERANCE:
+            self._decrease(DECREASE_FACTOR, recent, floor=self.initial)
+        elif self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.peak_limit = max(self.peak_limit, self.limit)
+
+    def _decrease(self, factor: float, window: float = 1.0, floor: float = 0.0):
+        now = time.monotonic()
+        if now - self._decreased_at < window or self.limit <= floor:
+            return
+        self._decreased_at = now
+        self.limit = max(self.min_limit, floor, self.limit * factor)
+        self.decreases += 1
+
+    def close(self):
+        """Stop watching for stalls until the next request."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    def summary(self) -> str:
+        return (
+            f"limit {int(self.limit)} (peak {int(self.peak_limit)}), "
+            f"{self.decreases} slowdowns, {self.retries} retries"
+        )
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """A Retry-After header, in seconds or as an HTTP date, as a delay."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def mealie_retry_after(error: Exception, idempotent: bool = True) -> float | None:
+    status = getattr(error, "status_code", None)
+    if status == 429 or (idempotent and status in RETRY_STATUSES):
+        return float(getattr(error, "retry_after", None) or 0)
+    if isinstance(error, MealieConnectionError):
+        # A refused connection never reached the server
+        details = getattr(error, "details", None) or {}
+        if idempotent or details.get("error_type") == "ConnectError":
+            return 0.0
+    if idempotent and isinstance(error, MealieTimeoutError):
+        return 0.0
+    return None
+
+
+def http_retry_after(error: Exception) -> float | None:
+    """For urllib-based clients such as SPARQLWrapper."""
+    if isinstance(error, urllib.error.HTTPError):
+        if error.code not in RETRY_STATUSES:
+            return None
+        return retry_after_seconds(error.headers.get("Retry-After")) or 0.0
+    # SPARQLWrapper turns a 500 into EndPointInternalError
+    if type(error).__name__ == "EndPointInternalError":
+        return 0.0
+    if isinstance(error, (urllib.error.URLError, OSError)):
+        return 0.0
+    return None
+
+
+@asynccontextmanager
+async def governed(client) -> AsyncIterator[Governor]:
+    """
+    Route every request `client` makes through a governor of its own for the
+    duration of the block. The client's own fixed-delay retries are turned
+    off in favour of the governor's, which honour a Retry-After header.
+    """
+    governor = Governor()
+    request = client.request
+    handle_response = client._handle_response
+    saved = {
+        name: client.__dict__.get(name) for name in ("request", "_handle_response")
+    }
+    max_retries = client.max_retries
+
+    async def governed_request(method: str, endpoint: str, *args, **kwargs):
+        # A page of 100 recipes is not comparable with a single one
+        key = route(method, endpoint)
+        idempotent = key not in NON_IDEMPOTENT_ROUTES
+        if per_page := (kwargs.get("params") or {}).get("perPage"):
+            key += f"?perPage={per_page}"
+        return await governor.run(
+            key,
+            lambda: request(method, endpoint, *args, **kwargs),
+            lambda error: mealie_retry_after(error, idempotent),
+        )
+
+    async def handle_retry_after(response, request_id):
+        # The client only reads retry_after from the body, not the header
+        try:
+            return await handle_response(response, request_id)
+        except MealieAPIError as e:
+            delay = retry_after_seconds(response.headers.get("Retry-After"))
+            if delay is not None:
+                e.retry_after = delay
+            raise
+
+    client.request = governed_request
+    client._handle_response = handle_retry_after
+    client.max_retries = 0
+    try:
+        yield governor
+    finally:
+        governor.close()
+        for name, value in saved.items():
+            if value is None:
+                delattr(client, name)
+            else:
+                setattr(client, name, value)
+        client.max_retries = max_retries
+        if governor.retries or governor.decreases:
+            print(f"\nMealie requests: {governor.summary()}.")
@@ -1,7 +1,14 @@
+import argparse
 import asyncio
 import re
-from mealie_client import MealieClient
-from common import BASE_URL, API_TOKEN
+from common import BASE_URL, mealie_session
+from pagination import add_pagination_arguments
+from pipeline import run_pipeline
+from profiling import add_profile_arguments, profiled
+from snapshot import add_snapshot_arguments, open_snapshot
+
+# Only recipes without tools are listed and fetched
+QUERY_FILTER = "tools.id IS NULL"
 
 
 async def has_missing_tools(recipe) -> bool:
@@ -11,18 +18,14 @@ async def has_missing_tools(recipe) -> bool:
     return len(recipe.tools) == 0
 
 
+@profiled
 async def find_tool_mentions(recipe) -> list[str]:
     """
     Search for tool-related keywords (oven, grill, fry) in recipe steps.
     Returns a list of matched phrases or empty list.
     """
     matches = []
-    for step in recipe.recipeInstructions:
-        text = step["text"]
-
-        if not text:
-            continue
-
+    for text in recipe.instructions:
         found = re.findall(
             r"(skillet|wok|blend|food processor|bake|oven|grill|broil|fry(?:ing)?)",
             text,
@@ -35,28 +38,54 @@ async def find_tool_mentions(recipe) -> list[str]:
     return matches
 
 
-async def main():
-    async with MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client:
-        print("Fetching recipes from Mealie…")
+def add_arguments(parser: argparse.ArgumentParser):
+    add_snapshot_arguments(parser)
+    add_pagination_arguments(parser)
+    add_profile_arguments(parser)
 
-        page = 1
-        while page == 1 or len(all_recipes) == 100:
-            all_recipes = await client.recipes.get_all(per_page=100, page=page)
-            page = page + 1
-            print(f"Found {len(all_recipes)} recipes.\n")
 
-            for recipe_summary in all_recipes:
-                recipe = await client.recipes.get(recipe_summary.id)
-                missing_tools = await has_missing_tools(recipe)
-                tool_mentions = await find_tool_mentions(recipe)
+async def run(client, args: argparse.Namespace):
+    print("Fetching recipes from Mealie…")
 
-                if missing_tools and tool_mentions:
-                    print(
-                        f"{recipe_summary.name} ({BASE_URL}/g/home/r/{recipe_summary.slug}) missing tools"
-                    )
-                    for match in tool_mentions:
-                        print(f"   ↳ {match}")
+    async def analyze(recipe):
+        if not await has_missing_tools(recipe):
+            return
+        tool_mentions = await find_tool_mentions(recipe)
+
+        if tool_mentions:
+            print(
+                f"{recipe.name} ({BASE_URL}/g/home/r/{recipe.slug}) missing tools"
+            )
+            for match in tool_mentions:
+                print(f"   ↳ {match}")
+
+    snapshot = open_snapshot(args)
+    try:
+        stats = await run_pipeline(
+            client,
+            analyze,
+            snapshot=snapshot,
+            query_filter=QUERY_FILTER,
+            per_page=args.page_size,
+            page_concurrency=args.page_concurrency,
+            # Steps are only needed for recipes without tools
+            needs_detail=lambda recipe_summary: not recipe_summary.tools,
+        )
+    finally:
+        snapshot.close()
+    print(f"\nScanned {stats.scanned} candidate recipes.")
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(
+        description="Show recipes with no tools that mention tool keywords in steps."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -1,26 +1,56 @@
+import argparse
 import asyncio
-from mealie_client import MealieClient
-from common import BASE_URL, API_TOKEN
+from common import BASE_URL, mealie_session
+from pagination import add_pagination_arguments
+from pipeline import run_pipeline
+from profiling import add_profile_arguments
+from snapshot import add_snapshot_arguments, open_snapshot
 
+# Only recipes without categories are listed and fetched
+QUERY_FILTER = "recipe_category.id IS NULL"
 
-async def main():
-    async with MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client:
-        print("Fetching recipes from Mealie…")
 
-        page = 1
-        while page == 1 or len(all_recipes) == 100:
-            all_recipes = await client.recipes.get_all(per_page=100, page=page)
-            page = page + 1
-            print(f"Found {len(all_recipes)} recipes.\n")
+def add_arguments(parser: argparse.ArgumentParser):
+    add_snapshot_arguments(parser)
+    add_pagination_arguments(parser)
+    add_profile_arguments(parser)
 
-            for recipe_summary in all_recipes:
-                recipe = await client.recipes.get(recipe_summary.id)
 
-                if len(recipe.recipe_category) == 0:
-                    print(
-                        f"{recipe.name} ({BASE_URL}/g/home/r/{recipe.slug}) has no categories"
-                    )
+async def run(client, args: argparse.Namespace):
+    print("Fetching recipes from Mealie…")
+
+    def analyze(recipe):
+        if len(recipe.recipe_category) == 0:
+            print(
+                f"{recipe.name} ({BASE_URL}/g/home/r/{recipe.slug}) has no categories"
+            )
+
+    snapshot = open_snapshot(args)
+    try:
+        stats = await run_pipeline(
+            client,
+            analyze,
+            snapshot=snapshot,
+            query_filter=QUERY_FILTER,
+            per_page=args.page_size,
+            page_concurrency=args.page_concurrency,
+            fields={"name", "slug", "recipe_category"},
+        )
+    finally:
+        snapshot.close()
+    print(f"\nScanned {stats.scanned} candidate recipes.")
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(
+        description="Show all recipes that have no categories assigned."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
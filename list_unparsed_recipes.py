@@ -1,39 +1,67 @@
+import argparse
 import asyncio
-from mealie_client import MealieClient
-from common import BASE_URL, API_TOKEN
+from common import BASE_URL, mealie_session
+from pagination import add_pagination_arguments
+from pipeline import run_pipeline
+from profiling import add_profile_arguments, profiled
+from snapshot import add_snapshot_arguments, open_snapshot
 
+# Only recipes with at least one unparsed ingredient are listed and fetched
+QUERY_FILTER = "recipe_ingredient.food.id IS NULL"
 
-async def has_unparsed_ingredients(recipe: dict) -> bool:
+
+@profiled
+async def has_unparsed_ingredients(recipe) -> bool:
     """
-    Check if the given recipe dict contains any ingredients
+    Check if the given recipe contains any ingredients
     whose parsed fields are missing or incomplete.
     """
-    for ingredient in recipe.recipeIngredient:
-        if ingredient.get("food") is not None:
+    for ingredient in recipe.ingredients:
+        if ingredient.food_id is not None:
             return False
     return True
 
 
-async def main():
-    async with MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client:
-        print("Fetching recipes from Mealie…")
+def add_arguments(parser: argparse.ArgumentParser):
+    add_snapshot_arguments(parser)
+    add_pagination_arguments(parser)
+    add_profile_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    print("Fetching recipes from Mealie…")
 
-        page = 1
-        while page == 1 or len(all_recipes) == 100:
-            all_recipes = await client.recipes.get_all(per_page=100, page=page)
-            page = page + 1
-            print(f"Found {len(all_recipes)} recipes.")
+    async def analyze(recipe):
+        if await has_unparsed_ingredients(recipe):
+            print(
+                f"❗ {recipe.name} (ID: {BASE_URL}/g/home/r/{recipe.slug}) has unparsed ingredients"
+            )
 
-            for recipe_summary in all_recipes:
-                recipe_id = recipe_summary.id
-                recipe_name = recipe_summary.name
-                recipe = await client.recipes.get(recipe_id)
+    snapshot = open_snapshot(args)
+    try:
+        stats = await run_pipeline(
+            client,
+            analyze,
+            snapshot=snapshot,
+            query_filter=QUERY_FILTER,
+            per_page=args.page_size,
+            page_concurrency=args.page_concurrency,
+        )
+    finally:
+        snapshot.close()
+    print(f"\nScanned {stats.scanned} candidate recipes.")
 
-                if await has_unparsed_ingredients(recipe):
-                    print(
-                        f"❗ {recipe_name} (ID: {BASE_URL}/g/home/r/{recipe_summary.slug}) has unparsed ingredients"
-                    )
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(
+        description="Show all recipes with unparsed ingredients."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
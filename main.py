@@ -1,6 +1,18 @@
 import sys
 
+# Everything but sys is imported lazily, so the menu and --help stay instant
+
 TOOLS: list[dict[str, str]] = [
+    {
+        "name": "snapshot",
+        "desc": "Sync the local recipe snapshot the other scripts read from",
+        "usage": "uv run python3 snapshot.py [--refresh full]",
+    },
+    {
+        "name": "maintain",
+        "desc": "Run assign_tools, tag_vegetarian and categories in one pass",
+        "usage": "uv run python3 maintain.py [tools] [vegetarian] [categories]",
+    },
     {
         "name": "assign_tools",
         "desc": "Match tool keywords in recipe steps to Mealie tools and assign them",
@@ -16,6 +28,16 @@ TOOLS: list[dict[str, str]] = [
         "desc": "Auto-assign Dinner/Lunch/Breakfast categories by keyword matching",
         "usage": "uv run python3 update_recipe_categories.py",
     },
+    {
+        "name": "webhook",
+        "desc": "Run the recipe rules on recipes as Mealie creates or updates them",
+        "usage": "uv run python3 webhook.py [tools vegetarian categories] [--port 8765]",
+    },
+    {
+        "name": "apply_plan",
+        "desc": "Apply a change plan written by the scripts above with --plan",
+        "usage": "uv run python3 apply_plan.py plan.jsonl [--concurrency 32]",
+    },
     {
         "name": "list_unparsed_recipes",
         "desc": "Show all recipes with unparsed ingredients (food field is null)",
@@ -31,20 +53,36 @@ TOOLS: list[dict[str, str]] = [
         "desc": "Show recipes with no tools that mention tool keywords in steps",
         "usage": "uv run python3 list_missing_tools.py",
     },
+    {
+        "name": "find_duplicate_foods",
+        "desc": "Find likely duplicate foods and write ranked merge candidates",
+        "usage": "uv run python3 find_duplicate_foods.py [--threshold 0.5]",
+    },
     {
         "name": "merge_ingredients",
         "desc": "Merge one ingredient into another (makes it an alias)",
-        "usage": "uv run python3 merge_ingredients.py <main_food> <alias_food>",
+        "usage": "uv run python3 merge_ingredients.py <main_food> <alias_food> | --pairs duplicate_foods.csv",
     },
     {
         "name": "add_wikidata_aliases",
         "desc": "Enrich ingredients with aliases and descriptions from Wikidata",
-        "usage": "uv run python3 add_wikidata_aliases.py",
+        "usage": "uv run python3 add_wikidata_aliases.py [--index wikidata_index.sqlite3]",
+    },
+    {
+        "name": "wikidata_index",
+        "desc": "Build an offline Wikidata food index from a JSON dump",
+        "usage": "uv run python3 wikidata_index.py latest-all.json.gz",
     },
 ]
 
+# Tools that never talk to Mealie
+OFFLINE_TOOLS: set[str] = {"wikidata_index"}
+
+# Separates chained commands; a tool name alone may be an option's value
+SEPARATOR = "+"
+
 
-def main():
+def print_menu():
     print("mealie-data-tools — Mealie data management scripts\n")
     print(f"{'Script':30s} Description")
     print("-" * 80)
@@ -55,8 +93,79 @@ def main():
     for tool in TOOLS:
         print(f"  {tool['usage']}")
     print()
+    print("Run several tools in one process, sharing one Mealie connection:")
+    print("  uv run python3 main.py assign_tools --refresh full + tag_vegetarian")
+    print()
     print("Set MEALIE_URL and API_TOKEN in .env first.")
 
 
+def parse_commands(argv: list[str]) -> list[tuple[str, object, object]]:
+    """
+    Split argv at each SEPARATOR into commands, each a tool name followed by
+    its arguments, and parse those with the tool's own parser. Returns
+    (name, module, args).
+    """
+    import argparse
+    import importlib
+
+    descriptions = {tool["name"]: tool["desc"] for tool in TOOLS}
+    commands: list[tuple[str, list[str]]] = [("", [])]
+    for arg in argv:
+        if arg == SEPARATOR:
+            commands.append(("", []))
+        elif not commands[-1][0]:
+            if arg not in descriptions:
+                print(
+                    f"Unknown tool '{arg}'. Run main.py without arguments for "
+                    "the list."
+                )
+                sys.exit(2)
+            commands[-1] = (arg, [])
+        else:
+            commands[-1][1].append(arg)
+    if any(not name for name, _ in commands):
+        print(f"Expected a tool name after '{SEPARATOR}'.")
+        sys.exit(2)
+
+    parsed = []
+    for name, tool_argv in commands:
+        module = importlib.import_module(name)
+        parser = argparse.ArgumentParser(
+            prog=f"main.py {name}", description=descriptions[name]
+        )
+        module.add_arguments(parser)
+        parsed.append((name, module, parser.parse_args(tool_argv)))
+    return parsed
+
+
+async def run_commands(commands: list[tuple[str, object, object]]):
+    from contextlib import AsyncExitStack
+    from profiling import profiling
+
+    async with AsyncExitStack() as stack:
+        client = None
+        if any(name not in OFFLINE_TOOLS for name, _, _ in commands):
+            from common import mealie_session
+
+            # One session for every command; each is profiled on its own
+            client = await stack.enter_async_context(mealie_session())
+
+        for name, module, args in commands:
+            if len(commands) > 1:
+                print(f"\n=== {name} ===")
+            async with profiling(args, client):
+                await module.run(client, args)
+
+
+def main(argv: list[str]):
+    if not argv or argv[0] in ("-h", "--help"):
+        print_menu()
+        return
+
+    import asyncio
+
+    asyncio.run(run_commands(parse_commands(argv)))
+
+
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
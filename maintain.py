@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+from common import mealie_session
+from assign_tools import ToolsRule
+from rules import add_rule_arguments, run_rules
+from tag_vegetarian import VegetarianRule
+from update_recipe_categories import CategoryRule
+
+RULES = {
+    "tools": ToolsRule,
+    "vegetarian": VegetarianRule,
+    "categories": CategoryRule,
+}
+
+
+def rule_name(name: str) -> str:
+    if name not in RULES:
+        raise argparse.ArgumentTypeError(
+            f"unknown rule '{name}' (choose from {', '.join(RULES)})"
+        )
+    return name
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "rules",
+        nargs="*",
+        type=rule_name,
+        metavar="rule",
+        help=f"Rules to run: {', '.join(RULES)} (default: all).",
+    )
+    add_rule_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    rules = [RULES[name]() for name in args.rules or RULES]
+    await run_rules(client, rules, args)
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run tool assignment, vegetarian tagging and category "
+        "matching in a single pass, with one PATCH per changed recipe."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
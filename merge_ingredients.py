@@ -1,47 +1,202 @@
 import asyncio
 import argparse
-from mealie_client import MealieClient
-from common import BASE_URL, API_TOKEN
+import csv
+from collections import defaultdict
+from common import mealie_session
+from pagination import paginate
+from pipeline import WRITE_CONCURRENCY
+from profiling import add_profile_arguments
 
 
-async def main(main_food_name: str, alias_food_name: str):
-    async with MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client:
-        print(
-            f"Fetching foods from Mealie to merge '{alias_food_name}' into '{main_food_name}'…"
-        )
+class FoodIndex:
+    """Resolves food names, plurals and aliases (ignoring case) to foods."""
 
-        all_foods = {food.name: food for food in await client.foods.get_all()}
+    def __init__(self, foods: list[dict]):
+        self.by_name: dict[str, dict] = {}
+        self.by_alias: dict[str, dict] = {}
+        for food in foods:
+            self.by_name.setdefault(food["name"].casefold(), food)
+            other_names = [food.get("pluralName")]
+            other_names += [alias.get("name") for alias in food.get("aliases") or []]
+            for name in other_names:
+                if name:
+                    self.by_alias.setdefault(name.casefold(), food)
 
-        main_food = all_foods.get(main_food_name)
-        alias_food = all_foods.get(alias_food_name)
+    def resolve(self, name: str) -> dict | None:
+        key = name.strip().casefold()
+        return self.by_name.get(key) or self.by_alias.get(key)
 
-        if not main_food:
-            print(f"❌ Main food '{main_food_name}' not found.")
-            return
 
-        if not alias_food:
-            print(f"❌ Alias food '{alias_food_name}' not found.")
+def read_pairs(path: str) -> list[tuple[str, str]]:
+    """(keep, absorb) name pairs from a CSV such as find_duplicate_foods writes."""
+    pairs = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or row[0].startswith("#"):
+                continue
+            if [cell.strip().lower() for cell in row[:2]] == ["keep", "absorb"]:
+                continue
+            pairs.append((row[0].strip(), row[1].strip()))
+    return pairs
+
+
+def plan_merges(
+    pairs: list[tuple[str, str]], index: FoodIndex
+) -> list[list[tuple[dict, dict]]]:
+    """
+    Resolve name pairs to (keep, absorb) foods and order them into waves.
+    Whatever is merged into a food is merged before that food is itself
+    absorbed (C into B before B into A); merges within a wave are independent.
+    """
+    merges: dict[str, tuple[dict, dict]] = {}  # absorb id -> (keep, absorb)
+    for keep_name, absorb_name in pairs:
+        keep, absorb = index.resolve(keep_name), index.resolve(absorb_name)
+        if keep is None or absorb is None:
+            missing = keep_name if keep is None else absorb_name
+            print(
+                f"❌ Food '{missing}' not found, skipping "
+                f"'{absorb_name}' → '{keep_name}'."
+            )
+        elif keep["id"] == absorb["id"]:
+            print(f"⚠ '{absorb_name}' and '{keep_name}' are already the same food.")
+        elif absorb["id"] in merges:
+            print(
+                f"⚠ '{absorb['name']}' is already being merged into "
+                f"'{merges[absorb['id']][0]['name']}', skipping '{keep_name}'."
+            )
+        else:
+            merges[absorb["id"]] = (keep, absorb)
+
+    # Each food is absorbed at most once, so following keep links from any
+    # merge either ends or runs into a cycle
+    for absorb_id in list(merges):
+        if absorb_id not in merges:
+            continue
+        seen = []
+        food_id = absorb_id
+        while food_id in merges and food_id not in seen:
+            seen.append(food_id)
+            food_id = merges[food_id][0]["id"]
+        if food_id == absorb_id:
+            names = " → ".join(merges[cycle_id][1]["name"] for cycle_id in seen)
+            print(f"❌ Circular merges, skipping: {names}")
+            for cycle_id in seen:
+                del merges[cycle_id]
+
+    absorbed_into: dict[str, list[str]] = defaultdict(list)
+    for absorb_id, (keep, _) in merges.items():
+        absorbed_into[keep["id"]].append(absorb_id)
+
+    depths: dict[str, int] = {}
+
+    def depth(absorb_id: str) -> int:
+        if absorb_id not in depths:
+            depths[absorb_id] = 1 + max(
+                (depth(child) for child in absorbed_into[absorb_id]), default=-1
+            )
+        return depths[absorb_id]
+
+    waves: list[list[tuple[dict, dict]]] = []
+    for absorb_id, merge in merges.items():
+        wave = depth(absorb_id)
+        while len(waves) <= wave:
+            waves.append([])
+        waves[wave].append(merge)
+    return waves
+
+
+async def merge_food(client, keep: dict, absorb: dict):
+    # In Mealie, you don't add an alias by name, you absorb another food.
+    # This moves every recipe using `absorb` over to `keep` and deletes it.
+    await client.put(
+        "foods/merge", json_data={"fromFood": absorb["id"], "toFood": keep["id"]}
+    )
+
+
+async def merge_foods(client, pairs: list[tuple[str, str]], concurrency: int):
+    print("Fetching foods from Mealie…")
+    index = FoodIndex([item async for item in paginate(client, "foods")])
+
+    waves = plan_merges(pairs, index)
+    total = sum(len(wave) for wave in waves)
+    print(f"Merging {total} foods in {len(waves)} waves…\n")
+
+    slots = asyncio.Semaphore(concurrency)
+    failed: set[str] = set()
+    merged = 0
+
+    async def merge(keep: dict, absorb: dict):
+        nonlocal merged
+        if absorb["id"] in failed:
+            print(
+                f"⚠ Not merging '{absorb['name']}' into '{keep['name']}': an "
+                "earlier merge into it failed."
+            )
+            failed.add(keep["id"])
             return
+        async with slots:
+            try:
+                await merge_food(client, keep, absorb)
+            except Exception as e:
+                print(f"❌ Merging '{absorb['name']}' into '{keep['name']}' failed: {e}")
+                failed.add(keep["id"])
+                return
+        merged += 1
+        print(f"✅ Merged '{absorb['name']}' into '{keep['name']}'.")
 
-        print(f"Found main food '{main_food.name}' (ID: {main_food.id})")
-        print(f"Found alias food '{alias_food.name}' (ID: {alias_food.id})")
+    for wave in waves:
+        async with asyncio.TaskGroup() as tg:
+            for keep, absorb in wave:
+                tg.create_task(merge(keep, absorb))
 
-        # In Mealie, you don't add an alias by name, you absorb another food.
-        # This will merge the alias_food into the main_food.
-        await client.foods.merge(main_food.id, alias_food.id)
+    print(f"\nDone. Merged {merged} of {total} foods.")
 
-        print(f"✅ Successfully merged '{alias_food_name}' into '{main_food_name}'.")
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "main_food", nargs="?", help="The name of the ingredient to keep."
+    )
+    parser.add_argument(
+        "alias_food",
+        nargs="?",
+        help="The name of the ingredient to merge and make an alias.",
+    )
+    parser.add_argument(
+        "--pairs",
+        metavar="CSV",
+        help="Merge every keep,absorb pair in a CSV (such as the one "
+        "find_duplicate_foods.py writes) instead of a single pair.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=WRITE_CONCURRENCY,
+        help=f"Merges sent at once (default: {WRITE_CONCURRENCY}).",
+    )
+    add_profile_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    if args.pairs:
+        pairs = read_pairs(args.pairs)
+    elif args.main_food and args.alias_food:
+        pairs = [(args.main_food, args.alias_food)]
+    else:
+        print("❌ Give a main food and an alias food, or --pairs.")
+        return
+    await merge_foods(client, pairs, args.concurrency)
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Merge one ingredient into another in Mealie."
     )
-    parser.add_argument("main_food", help="The name of the ingredient to keep.")
-    parser.add_argument(
-        "alias_food", help="The name of the ingredient to merge and make an alias."
-    )
-
+    add_arguments(parser)
     args = parser.parse_args()
 
-    asyncio.run(main(args.main_food, args.alias_food))
+    asyncio.run(main(args))
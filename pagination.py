@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from weakref import WeakKeyDictionary
+
+PER_PAGE = 100
+PAGE_CONCURRENCY = 4
+
+# client -> endpoint -> items, see get_organizers
+_organizers: WeakKeyDictionary = WeakKeyDictionary()
+
+
+async def paginate(
+    client,
+    endpoint: str,
+    *,
+    params: dict | None = None,
+    per_page: int = PER_PAGE,
+    concurrency: int = PAGE_CONCURRENCY,
+    start_page: int = 1,
+    on_total: Callable[[int | None], None] | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Yield every item of a paginated Mealie endpoint (recipes, foods,
+    organizers/...) in order.
+
+    The first response gives `total_pages`; the remaining pages are then
+    fetched up to `concurrency` at a time, ahead of the consumer. Endpoints
+    that answer with a plain list are yielded as-is. `start_page` skips the
+    pages before it. `on_total` is called with the item count the first
+    response reports.
+    """
+
+    async def fetch(page: int):
+        return await client.get(
+            endpoint, params={**(params or {}), "page": page, "perPage": per_page}
+        )
+
+    first = await fetch(start_page)
+    if not isinstance(first, dict):
+        for item in first or []:
+            yield item
+        return
+
+    if on_total is not None:
+        on_total(first.get("total"))
+    total_pages = first.get("total_pages") or 1
+    next_page = start_page + 1
+    pending: deque[asyncio.Task] = deque()
+
+    def prefetch():
+        nonlocal next_page
+        while next_page <= total_pages and len(pending) < concurrency:
+            pending.append(asyncio.create_task(fetch(next_page)))
+            next_page += 1
+
+    try:
+        prefetch()
+        for item in first.get("items", []):
+            yield item
+        while pending:
+            response = await pending.popleft()
+            prefetch()
+            for item in response.get("items", []):
+                yield item
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def get_organizers(client, endpoint: str) -> list[dict]:
+    """
+    Every item of an organizer endpoint such as "organizers/tools", fetched
+    once per client so tools chained in main.py share the lookup.
+    """
+    cache = _organizers.setdefault(client, {})
+    if endpoint not in cache:
+        cache[endpoint] = [item async for item in paginate(client, endpoint)]
+    return cache[endpoint]
+
+
+def add_pagination_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=PER_PAGE,
+        help=f"Items per list request (default: {PER_PAGE}).",
+    )
+    parser.add_argument(
+        "--page-concurrency",
+        type=int,
+        default=PAGE_CONCURRENCY,
+        help=f"List pages fetched at once (default: {PAGE_CONCURRENCY}).",
+    )
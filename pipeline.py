@@ -0,0 +1,203 @@
+import asyncio
+import inspect
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+from pagination import PAGE_CONCURRENCY, PER_PAGE, paginate
+from profiling import phase
+from records import RecipeRecord
+
+# Defaults for the three stages. The queues between stages are bounded, so a
+# slow stage applies backpressure to the one before it instead of letting
+# fetched recipes pile up in memory.
+FETCH_CONCURRENCY = 8
+WRITE_CONCURRENCY = 4
+QUEUE_SIZE = 100
+
+# RecipeRecord attributes the paginated listing already carries. Analyses
+# that only read these never need the full recipe.
+SUMMARY_FIELDS = frozenset({
+    "id", "slug", "name", "description", "date_updated", "tools", "tags",
+    "recipe_category",
+})
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStats:
+    scanned: int = 0
+    changed: int = 0
+    written: int = 0
+    summary_only: int = 0
+    fetch_errors: int = 0
+
+
+async def run_pipeline(
+    client,
+    analyze: Callable[[Any], Any],
+    write: Callable[[Any, Any, Any], Awaitable[None]] | None = None,
+    *,
+    per_page: int = PER_PAGE,
+    page_concurrency: int = PAGE_CONCURRENCY,
+    fetch_concurrency: int = FETCH_CONCURRENCY,
+    write_concurrency: int = WRITE_CONCURRENCY,
+    queue_size: int = QUEUE_SIZE,
+    skip_fetch_errors: bool = False,
+    snapshot=None,
+    query_filter: str | None = None,
+    fields: set[str] | None = None,
+    needs_detail: Callable[[RecipeRecord], bool] | None = None,
+    checkpoint=None,
+    write_reports_handled: bool = False,
+    analyze_concurrency: int = 1,
+) -> PipelineStats:
+    """
+    Page through every recipe, fetch its full detail, analyze it and write
+    back any resulting change.
+
+    Recipes stream through as `records.RecipeRecord`s and are dropped once
+    written, so memory stays bounded by the queue sizes rather than the
+    library size.
+
+    `analyze(recipe)` returns a change (anything but None) or None when the
+    recipe needs no update; it may be a coroutine function.
+    `write(client, recipe, change)` persists a change. Detail fetches and
+    writes run on their own pools of workers joined by bounded queues.
+
+    When a `snapshot.Snapshot` is given, recipes whose `dateUpdated` has not
+    moved are read from it instead of being fetched again.
+
+    `query_filter` is passed on to Mealie as queryFilter (e.g.
+    "tools.id IS NULL") so only matching recipes are listed and fetched.
+    Treat it as a prefilter: `analyze` should still check the recipes it is
+    given.
+
+    `fields` names the recipe attributes `analyze` reads. When they are all
+    in SUMMARY_FIELDS, `analyze` gets the listing's summaries and no detail
+    is fetched. `needs_detail(summary)` decides per recipe instead and takes
+    precedence over `fields`.
+
+    With a `checkpoint.Checkpoint`, listing resumes from its last completed
+    page, recipes it already handled are skipped, and each recipe is
+    reported to it once analyzed (and written, if changed). With
+    `write_reports_handled`, `write` reports the recipes it wrote itself,
+    e.g. once a buffered batch has been sent.
+
+    `analyze_concurrency` runs that many analyses at once, which only helps
+    when `analyze` awaits work done elsewhere, such as an
+    `analysis.AnalysisPool`.
+    """
+    stats = PipelineStats()
+    summaries: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    recipes: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    changes: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    start_page = 1
+    if needs_detail is None:
+        detail = fields is None or not fields <= SUMMARY_FIELDS
+
+        def needs_detail(recipe_summary) -> bool:
+            return detail
+
+    async def list_recipes():
+        nonlocal start_page
+        params = {"queryFilter": query_filter} if query_filter else None
+        if checkpoint is not None:
+            start_page = await checkpoint.start_page(
+                client, "recipes", params, per_page
+            )
+        position = 0
+        async for item in paginate(
+            client,
+            "recipes",
+            params=params,
+            per_page=per_page,
+            concurrency=page_concurrency,
+            start_page=start_page,
+            on_total=checkpoint.listing_total if checkpoint is not None else None,
+        ):
+            page = start_page + position // per_page
+            position += 1
+            if snapshot is not None:
+                snapshot.mark_seen(item["id"])
+            if checkpoint is not None and not checkpoint.listed(item["id"], page):
+                continue
+            await summaries.put(RecipeRecord.from_dict(item))
+        if checkpoint is not None:
+            checkpoint.listing_finished()
+
+    async def fetch_recipes():
+        while (recipe_summary := await summaries.get()) is not _DONE:
+            if not needs_detail(recipe_summary):
+                stats.summary_only += 1
+                await recipes.put(recipe_summary)
+                continue
+            recipe = None
+            if snapshot is not None:
+                with phase("snapshot"):
+                    recipe = snapshot.get_recipe(recipe_summary)
+            if recipe is None:
+                try:
+                    data = await client.get(f"recipes/{recipe_summary.id}")
+                except Exception as e:
+                    if not skip_fetch_errors:
+                        raise
+                    print(f"⚠ Skipping '{recipe_summary.name}': {e}")
+                    stats.fetch_errors += 1
+                    continue
+                if snapshot is not None:
+                    with phase("snapshot"):
+                        snapshot.put_recipe(data)
+                recipe = RecipeRecord.from_dict(data)
+            await recipes.put(recipe)
+
+    async def analyze_recipes():
+        while (recipe := await recipes.get()) is not _DONE:
+            stats.scanned += 1
+            with phase("analyze"):
+                change = analyze(recipe)
+                if inspect.isawaitable(change):
+                    change = await change
+            if change is None:
+                if checkpoint is not None:
+                    await checkpoint.handled(recipe.id)
+                continue
+            stats.changed += 1
+            if write is not None:
+                await changes.put((recipe, change))
+            elif checkpoint is not None:
+                await checkpoint.handled(recipe.id)
+
+    async def write_changes():
+        while (item := await changes.get()) is not _DONE:
+            recipe, change = item
+            await write(client, recipe, change)
+            stats.written += 1
+            if checkpoint is not None and not write_reports_handled:
+                await checkpoint.handled(recipe.id)
+
+    async def close(stage: list[asyncio.Task], queue: asyncio.Queue, consumers: int):
+        # Once a stage is done, tell every worker of the next one to stop
+        await asyncio.wait(stage)
+        for _ in range(consumers):
+            await queue.put(_DONE)
+
+    async with asyncio.TaskGroup() as tg:
+        listing = [tg.create_task(list_recipes())]
+        fetchers = [tg.create_task(fetch_recipes()) for _ in range(fetch_concurrency)]
+        analyzers = [
+            tg.create_task(analyze_recipes()) for _ in range(analyze_concurrency)
+        ]
+        for _ in range(write_concurrency):
+            tg.create_task(write_changes())
+        tg.create_task(close(listing, summaries, fetch_concurrency))
+        tg.create_task(close(fetchers, recipes, analyze_concurrency))
+        tg.create_task(close(analyzers, changes, write_concurrency))
+
+    if snapshot is not None:
+        # A filtered or resumed listing does not show which recipes were deleted
+        if query_filter is None and start_page == 1:
+            snapshot.prune_unseen()
+        snapshot.commit()
+
+    return stats
@@ -0,0 +1,290 @@
+import argparse
+import functools
+import inspect
+import json
+import re
+import resource
+import sys
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+TRACE_PATH = "profile.jsonl"
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS: list[float] = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Path segments that are ids rather than part of the route
+_ID_SEGMENT_RE = re.compile(
+    r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}|\d+"
+)
+# recipes/<x> routes that are not a recipe id or slug
+_RECIPE_ROUTES = {"bulk-actions", "exports", "summary", "timeline"}
+
+# The response of the request in flight in the current task
+_response: ContextVar[dict | None] = ContextVar("_response", default=None)
+
+_active: "Profiler | None" = None
+
+
+def peak_rss_mib() -> float:
+    """Highest resident memory of this process so far."""
+    # getrusage also counts the parent's memory at the time this process
+    # was spawned, so prefer the kernel's high-water mark for our own pages
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def route(method: str, endpoint: str) -> str:
+    """'GET recipes/<uuid>' -> 'GET recipes/{id}', likewise for slugs."""
+    segments = [
+        "{id}" if _ID_SEGMENT_RE.fullmatch(segment) else segment
+        for segment in endpoint.strip("/").split("/")
+    ]
+    if (
+        len(segments) == 2
+        and segments[0] == "recipes"
+        and segments[1] not in _RECIPE_ROUTES | {"{id}"}
+    ):
+        segments[1] = "{slug}"
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class Profiler:
+    """
+    Records every Mealie request (latency, status, bytes received) per route
+    and the time spent in named phases, and writes them as a JSONL trace.
+    """
+
+    def __init__(self, trace_path: str):
+        self.started = time.perf_counter()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.bytes: dict[str, int] = defaultdict(int)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.phase_seconds: dict[str, float] = defaultdict(float)
+        self.phase_calls: dict[str, int] = defaultdict(int)
+        # Request events go straight to the trace instead of piling up
+        self.trace = open(trace_path, "w")
+
+    def instrument(self, client):
+        """Wrap the client's request and response handling on this instance."""
+        request = client.request
+        handle_response = client._handle_response
+        # Wrappers already on the instance (see governor.governed) to restore
+        self._saved = {
+            name: client.__dict__[name]
+            for name in ("request", "_handle_response")
+            if name in client.__dict__
+        }
+
+        async def timed_request(method: str, endpoint: str, *args, **kwargs):
+            response = {"status": None, "bytes": 0}
+            token = _response.set(response)
+            started = time.perf_counter()
+            try:
+                return await request(method, endpoint, *args, **kwargs)
+            finally:
+                _response.reset(token)
+                self.record_request(
+                    method,
+                    endpoint,
+                    time.perf_counter() - started,
+                    response["status"],
+                    response["bytes"],
+                )
+
+        async def measured_handle_response(http_response, request_id):
+            if (response := _response.get()) is not None:
+                response["status"] = http_response.status_code
+                response["bytes"] += len(http_response.content)
+            return await handle_response(http_response, request_id)
+
+        client.request = timed_request
+        client._handle_response = measured_handle_response
+
+    def uninstrument(self, client):
+        """Drop the wrappers, so a shared client can be profiled again."""
+        for name in ("request", "_handle_response"):
+            if name in self._saved:
+                setattr(client, name, self._saved[name])
+            else:
+                delattr(client, name)
+
+    def record_request(
+        self, method: str, endpoint: str, seconds: float, status: int | None, size: int
+    ):
+        name = route(method, endpoint)
+        self.latencies[name].append(seconds)
+        self.bytes[name] += size
+        if status is None or status >= 400:
+            self.errors[name] += 1
+        event = {
+            "type": "request",
+            "route": name,
+            "endpoint": endpoint,
+            "at": round(time.perf_counter() - self.started, 6),
+            "seconds": round(seconds, 6),
+            "status": status,
+            "bytes": size,
+        }
+        self.trace.write(json.dumps(event) + "\n")
+
+    def record_phase(self, name: str, seconds: float):
+        self.phase_seconds[name] += seconds
+        self.phase_calls[name] += 1
+
+    def summary(self) -> list[dict]:
+        records = []
+        for name, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for seconds in ordered:
+                histogram[bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+            records.append(
+                {
+                    "type": "route",
+                    "route": name,
+                    "requests": len(ordered),
+                    "errors": self.errors[name],
+                    "bytes": self.bytes[name],
+                    "seconds": sum(ordered),
+                    "mean_ms": sum(ordered) / len(ordered) * 1000,
+                    "p50_ms": ordered[len(ordered) // 2] * 1000,
+                    "p95_ms": ordered[int(len(ordered) * 0.95)] * 1000,
+                    "max_ms": ordered[-1] * 1000,
+                    "histogram_ms": dict(
+                        zip([*map(str, LATENCY_BUCKETS_MS), "inf"], histogram)
+                    ),
+                }
+            )
+        for name, seconds in sorted(self.phase_seconds.items()):
+            records.append(
+                {
+                    "type": "phase",
+                    "phase": name,
+                    "calls": self.phase_calls[name],
+                    "seconds": seconds,
+                }
+            )
+        records.append(
+            {
+                "type": "run",
+                "seconds": time.perf_counter() - self.started,
+                "peak_rss_mib": peak_rss_mib(),
+            }
+        )
+        return records
+
+    def print_report(self, records: list[dict]):
+        run = records[-1]
+        print(
+            f"\nProfile ({run['seconds']:.2f}s wall, "
+            f"peak RSS {run['peak_rss_mib']:.1f} MiB):"
+        )
+        print(
+            f"  {'Route':36s} {'Requests':>8s} {'KiB':>9s} {'Mean ms':>8s} "
+            f"{'p50 ms':>8s} {'p95 ms':>8s} {'Max ms':>8s}"
+        )
+        for r in records:
+            if r["type"] == "route":
+                print(
+                    f"  {r['route']:36s} {r['requests']:8d} {r['bytes'] / 1024:9.1f} "
+                    f"{r['mean_ms']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+                    f"{r['max_ms']:8.1f}"
+                )
+        print(f"\n  {'Phase':36s} {'Calls':>8s} {'Seconds':>9s}")
+        for r in records:
+            if r["type"] == "phase":
+                print(f"  {r['phase']:36s} {r['calls']:8d} {r['seconds']:9.3f}")
+
+    def dump(self, records: list[dict]):
+        """Append the summary records to the trace and close it."""
+        with self.trace:
+            for record in records:
+                self.trace.write(json.dumps(record) + "\n")
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a block under `name` when profiling is on."""
+    if _active is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _active.record_phase(name, time.perf_counter() - started)
+
+
+def profiled(func):
+    """Time every call of `func` as a phase named after it when profiling is on."""
+    name = func.__qualname__
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if _active is None:
+                return await func(*args, **kwargs)
+            with phase(name):
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _active is None:
+            return func(*args, **kwargs)
+        with phase(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@asynccontextmanager
+async def profiling(
+    args: argparse.Namespace, client
+) -> AsyncIterator[Profiler | None]:
+    """
+    With --profile, instrument `client` and the profiled functions for the
+    duration of the block, then print the report and write the trace.
+    """
+    global _active
+    if not getattr(args, "profile", None):
+        yield None
+        return
+    profiler = Profiler(args.profile)
+    profiler.instrument(client)
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = None
+        profiler.uninstrument(client)
+        records = profiler.summary()
+        profiler.print_report(records)
+        profiler.dump(records)
+        print(f"\nTrace written to {args.profile}.")
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=TRACE_PATH,
+        metavar="TRACE",
+        help="Print request and phase timings at the end and write a JSONL "
+        f"trace (default: {TRACE_PATH}).",
+    )
@@ -0,0 +1,90 @@
+from typing import NamedTuple
+
+
+class Ingredient(NamedTuple):
+    food_id: str | None
+    food_name: str | None
+    text: str
+    original_text: str
+
+
+class RecipeRecord:
+    """
+    The parts of a recipe the scans read, built straight from the API's
+    JSON (a listing item or a full recipe) and nothing else: no nutrition,
+    assets, settings or comments, and no model objects. Organizers stay as
+    the API's dicts. A listing item has no ingredients or instructions, so
+    those are empty there.
+    """
+
+    __slots__ = (
+        "id",
+        "slug",
+        "name",
+        "description",
+        "date_updated",
+        "tools",
+        "tags",
+        "recipe_category",
+        "ingredients",
+        "instructions",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        slug: str,
+        name: str,
+        description: str | None = None,
+        date_updated: str | None = None,
+        tools: list | None = None,
+        tags: list | None = None,
+        recipe_category: list | None = None,
+        ingredients: tuple[Ingredient, ...] = (),
+        instructions: tuple[str, ...] = (),
+    ):
+        self.id = id
+        self.slug = slug
+        self.name = name
+        self.description = description
+        self.date_updated = date_updated
+        self.tools = tools or []
+        self.tags = tags or []
+        self.recipe_category = recipe_category or []
+        self.ingredients = ingredients
+        self.instructions = instructions
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RecipeRecord":
+        ingredients = []
+        for ingredient in data.get("recipeIngredient") or ():
+            food = ingredient.get("food")
+            if not isinstance(food, dict):
+                food = {}
+            ingredients.append(
+                Ingredient(
+                    food.get("id"),
+                    food.get("name"),
+                    ingredient.get("text") or "",
+                    ingredient.get("originalText") or "",
+                )
+            )
+        return cls(
+            id=data["id"],
+            slug=data.get("slug"),
+            name=data.get("name"),
+            description=data.get("description"),
+            date_updated=data.get("dateUpdated"),
+            tools=data.get("tools"),
+            tags=data.get("tags"),
+            recipe_category=data.get("recipeCategory"),
+            ingredients=tuple(ingredients),
+            instructions=tuple(
+                step["text"]
+                for step in data.get("recipeInstructions") or ()
+                if step.get("text")
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"RecipeRecord(id={self.id!r}, slug={self.slug!r}, name={self.name!r})"
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import json
+from analysis import (
+    AnalysisPool,
+    Call,
+    add_analysis_arguments,
+    open_analysis_pool,
+    run_calls,
+)
+from checkpoint import add_checkpoint_arguments, open_checkpoint
+from pagination import add_pagination_arguments
+from pipeline import SUMMARY_FIELDS, PipelineStats, run_pipeline
+from profiling import add_profile_arguments, peak_rss_mib, phase
+from snapshot import Snapshot, add_snapshot_arguments, open_snapshot
+
+# Recipe attributes and the PATCH fields they are written back to
+PATCH_FIELDS: dict[str, str] = {
+    "tools": "tools",
+    "tags": "tags",
+    "recipe_category": "recipeCategory",
+}
+
+# Recipe attributes Mealie can add to in bulk: endpoint and payload key
+BULK_ACTIONS: dict[str, tuple[str, str]] = {
+    "tags": ("recipes/bulk-actions/tag", "tags"),
+    "recipe_category": ("recipes/bulk-actions/categorize", "categories"),
+}
+BULK_SIZE = 100
+
+
+class Rule:
+    """
+    A single maintenance check run by `run_rules`.
+
+    `load` fetches whatever organizers the rule needs and returns False when
+    the rule cannot run; it gets the run's snapshot, if there is one. `apply` inspects one recipe and returns the recipe
+    attributes it wants changed (see PATCH_FIELDS) mapped to their new list
+    of organizers, as the API's dicts, or an empty dict. Rules must not claim
+    the same attribute.
+
+    `fields` lists the recipe attributes `apply` reads; None means any. A
+    rule whose fields the listing summaries carry is applied to those
+    summaries without fetching the full recipe (see `needs_detail`).
+
+    `scan` may split the CPU-bound text matching out of `apply`: it returns
+    a module-level function and picklable arguments, and `apply` gets the
+    function's result as `scanned`. The function must not touch the rule
+    or print, since it may run in a worker process (see `analysis`).
+    """
+
+    name = ""
+    skip_fetch_errors = False
+    fields: frozenset[str] | None = None
+
+    async def load(self, client, snapshot: Snapshot | None = None) -> bool:
+        return True
+
+    def needs_detail(self, recipe_summary) -> bool:
+        return self.fields is None or not self.fields <= SUMMARY_FIELDS
+
+    def scan(self, recipe) -> Call | None:
+        return None
+
+    def apply(self, recipe, scanned=None) -> dict[str, list]:
+        return {}
+
+    def report(self) -> str | None:
+        return None
+
+
+async def apply_rules(
+    rules: list[Rule], recipe, pool: AnalysisPool | None = None
+) -> dict[str, list]:
+    """The merged changes of `rules` for `recipe`, scanning in `pool` if given."""
+    calls = [rule.scan(recipe) for rule in rules]
+    if pool is None or not any(calls):
+        results = run_calls(calls)
+    else:
+        results = await pool.run(calls)
+    changes: dict[str, list] = {}
+    for rule, scanned in zip(rules, results):
+        with phase(f"{type(rule).__name__}.apply"):
+            changes.update(rule.apply(recipe, scanned))
+    return changes
+
+
+async def patch_recipe(client, recipe, changes: dict[str, list]):
+    # Organizers are the API's own dicts, so they go out as they came in
+    await client.patch(
+        f"recipes/{recipe.id}",
+        json_data={PATCH_FIELDS[attr]: value for attr, value in changes.items()},
+    )
+
+
+def _bulk_additions(recipe, changes: dict[str, list]) -> list[tuple[str, object]] | None:
+    """
+    The (attribute, organizer) pairs `changes` adds to `recipe`, or None
+    when the change also removes something or touches an attribute the bulk
+    actions cannot write.
+    """
+    additions = []
+    for attr, value in changes.items():
+        if attr not in BULK_ACTIONS:
+            return None
+        current = {item["id"] for item in getattr(recipe, attr)}
+        if not current <= {item["id"] for item in value}:
+            return None
+        additions.extend((attr, item) for item in value if item["id"] not in current)
+    return additions
+
+
+class BulkWriter:
+    """
+    Pipeline writer that sends tag and category additions through Mealie's
+    bulk actions: one call per target organizer for every `batch_size`
+    recipes. Removals and other attributes fall back to `patch_recipe`.
+    Call `flush` after the pipeline to send the partial batches.
+
+    With a `checkpoint`, a recipe is reported handled only once every batch
+    holding one of its additions has been sent.
+    """
+
+    def __init__(self, batch_size: int = BULK_SIZE, checkpoint=None):
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        # (attribute, organizer id) -> (organizer, recipe ids and slugs)
+        self.pending: dict[tuple[str, str], tuple[dict, list[tuple[str, str]]]] = {}
+        # Recipe id -> batches holding its additions not sent yet
+        self.unsent: dict[str, int] = {}
+        self.bulk_requests = 0
+        self.patch_requests = 0
+
+    async def __call__(self, client, recipe, changes: dict[str, list]):
+        additions = _bulk_additions(recipe, changes)
+        if additions is None:
+            await patch_recipe(client, recipe, changes)
+            self.patch_requests += 1
+            await self._handled(recipe.id)
+            return
+        if not additions:
+            await self._handled(recipe.id)
+            return
+        self.unsent[recipe.id] = len(additions)
+        for attr, item in additions:
+            key = (attr, item["id"])
+            item, recipes = self.pending.setdefault(key, (item, []))
+            recipes.append((recipe.id, recipe.slug))
+            if len(recipes) >= self.batch_size:
+                del self.pending[key]
+                await self._send(client, attr, item, recipes)
+
+    async def flush(self, client):
+        pending, self.pending = self.pending, {}
+        for (attr, _), (item, recipes) in pending.items():
+            await self._send(client, attr, item, recipes)
+
+    def summary(self) -> str:
+        return (
+            f"Sent {self.bulk_requests} bulk requests and "
+            f"{self.patch_requests} PATCH requests."
+        )
+
+    async def _send(self, client, attr: str, item, recipes: list[tuple[str, str]]):
+        endpoint, key = BULK_ACTIONS[attr]
+        await client.post(
+            endpoint,
+            json_data={"recipes": [slug for _, slug in recipes], key: [item]},
+        )
+        self.bulk_requests += 1
+        for recipe_id, _ in recipes:
+            self.unsent[recipe_id] -= 1
+            if not self.unsent[recipe_id]:
+                del self.unsent[recipe_id]
+                await self._handled(recipe_id)
+
+    async def _handled(self, recipe_id: str):
+        if self.checkpoint is not None:
+            await self.checkpoint.handled(recipe_id)
+
+
+class PlanWriter:
+    """
+    Pipeline writer that records each change as a JSON line of recipe id,
+    PATCH field and the before/after organizer lists instead of sending it.
+    `apply_plan.py` replays the file later.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        # Line buffered, so every recorded change is on disk for --resume
+        self.file = open(path, "a" if append else "w", buffering=1)
+        self.entries = 0
+
+    async def __call__(self, client, recipe, changes: dict[str, list]):
+        for attr, value in changes.items():
+            entry = {
+                "id": recipe.id,
+                "name": recipe.name,
+                "field": PATCH_FIELDS[attr],
+                "before": getattr(recipe, attr),
+                "after": value,
+            }
+            self.file.write(json.dumps(entry, default=str) + "\n")
+            self.entries += 1
+
+    async def flush(self, client):
+        self.file.close()
+
+    def summary(self) -> str:
+        return (
+            f"Wrote {self.entries} changes to {self.path}; apply them with "
+            f"`apply_plan.py {self.path}`."
+        )
+
+
+def add_rule_arguments(parser: argparse.ArgumentParser):
+    add_snapshot_arguments(parser)
+    add_pagination_arguments(parser)
+    add_profile_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_analysis_arguments(parser)
+    parser.add_argument(
+        "--bulk-size",
+        type=int,
+        default=BULK_SIZE,
+        help="Recipes per bulk tag/categorize request; 0 sends one PATCH per "
+        f"recipe instead (default: {BULK_SIZE}).",
+    )
+    parser.add_argument(
+        "--plan",
+        metavar="FILE",
+        help="Write the changes to a JSONL plan instead of applying them; "
+        "run apply_plan.py on it later.",
+    )
+
+
+async def run_rules(
+    client, rules: list[Rule], args: argparse.Namespace
+) -> PipelineStats | None:
+    """
+    Load every recipe once, run all rules against it and send the merged
+    changes, batching tag and category additions into bulk actions.
+    """
+    # Opened first, so --refresh full also discards what the rules keep there
+    snapshot = open_snapshot(args)
+    try:
+        for rule in rules:
+            if not await rule.load(client, snapshot):
+                snapshot.close()
+                return None
+    except (Exception, asyncio.CancelledError):
+        snapshot.close()
+        raise
+
+    pool = open_analysis_pool(args)
+
+    async def analyze(recipe):
+        return await apply_rules(rules, recipe, pool) or None
+
+    def needs_detail(recipe_summary) -> bool:
+        return any(rule.needs_detail(recipe_summary) for rule in rules)
+
+    print("Fetching recipes from Mealie…")
+    if args.plan:
+        writer = PlanWriter(args.plan, append=args.resume)
+    elif args.bulk_size > 0:
+        writer = BulkWriter(args.bulk_size)
+    else:
+        writer = None
+    bulk = isinstance(writer, BulkWriter)
+    checkpoint = open_checkpoint(
+        args,
+        "-".join(sorted(rule.name for rule in rules)),
+        # Send the buffered bulk additions so their recipes can count as done
+        before_save=(lambda: writer.flush(client)) if bulk else None,
+    )
+    if bulk:
+        writer.checkpoint = checkpoint
+    try:
+        stats = await run_pipeline(
+            client,
+            analyze,
+            writer or patch_recipe,
+            skip_fetch_errors=any(rule.skip_fetch_errors for rule in rules),
+            snapshot=snapshot,
+            needs_detail=needs_detail,
+            per_page=args.page_size,
+            page_concurrency=args.page_concurrency,
+            checkpoint=checkpoint,
+            write_reports_handled=bulk,
+            analyze_concurrency=pool.capacity if pool is not None else 1,
+        )
+        if writer is not None:
+            await writer.flush(client)
+    except (Exception, asyncio.CancelledError):
+        try:
+            await checkpoint.save(final=True)
+            print("\n⚠ Stopped early; rerun with --resume to continue.")
+        except Exception:
+            pass
+        raise
+    finally:
+        snapshot.close()
+        if pool is not None:
+            pool.close()
+    checkpoint.finish()
+
+    outcome = "planned changes to" if args.plan else "updated"
+    print(f"\nDone. Scanned {stats.scanned} recipes, {outcome} {stats.written}.")
+    if stats.fetch_errors:
+        print(f"  Skipped {stats.fetch_errors} recipes that could not be fetched.")
+    if writer is not None:
+        print(f"  {writer.summary()}")
+    for rule in rules:
+        if report := rule.report():
+            print(f"  {rule.name}: {report}")
+    print(f"  Peak memory: {peak_rss_mib():.1f} MiB.")
+    return stats
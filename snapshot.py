@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import sqlite3
+from common import SNAPSHOT_PATH, mealie_session
+from fast_json import dumps, loads
+from pagination import add_pagination_arguments
+from pipeline import run_pipeline
+from profiling import add_profile_arguments
+from records import RecipeRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id TEXT PRIMARY KEY,
+    slug TEXT,
+    date_updated TEXT,
+    data TEXT NOT NULL
+);
+-- Organizers used to be mirrored here; the rules fetch them live instead
+DROP TABLE IF EXISTS organizers;
+CREATE TABLE IF NOT EXISTS food_verdicts (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    verdict INTEGER NOT NULL
+);
+"""
+
+
+def _timestamp(value) -> str | None:
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class Snapshot:
+    """
+    Local SQLite copy of the Mealie recipes.
+
+    Recipes are keyed by id and stored with their `dateUpdated`, so a scan
+    only has to refetch the recipes whose timestamp moved since the last run.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        # Ids listed during this scan, kept on the SQLite side so pruning
+        # does not hold every id in memory
+        self.conn.execute("CREATE TEMP TABLE seen (id TEXT PRIMARY KEY)")
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.conn.execute("DELETE FROM recipes")
+        self.conn.execute("DELETE FROM food_verdicts")
+        self.conn.commit()
+
+    def get_recipe(self, recipe_summary) -> RecipeRecord | None:
+        """
+        Return the stored recipe if it is as new as the given summary,
+        otherwise None.
+        """
+        date_updated = _timestamp(recipe_summary.date_updated)
+        row = self.conn.execute(
+            "SELECT date_updated, data FROM recipes WHERE id = ?",
+            (recipe_summary.id,),
+        ).fetchone()
+        if row is None or date_updated is None or row[0] != date_updated:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return RecipeRecord.from_dict(loads(row[1]))
+
+    def put_recipe(self, data: dict):
+        """Store a recipe as the API returned it."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO recipes (id, slug, date_updated, data) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                data["id"],
+                data.get("slug"),
+                _timestamp(data.get("dateUpdated")),
+                dumps(data),
+            ),
+        )
+
+    def mark_seen(self, recipe_id: str):
+        self.conn.execute("INSERT OR IGNORE INTO seen (id) VALUES (?)", (recipe_id,))
+
+    def prune_unseen(self):
+        """Drop recipes that no longer exist in Mealie, i.e. were not listed."""
+        self.conn.execute("DELETE FROM recipes WHERE id NOT IN (SELECT id FROM seen)")
+        self.conn.execute("DELETE FROM seen")
+
+    def food_verdicts(self, keywords: str) -> dict[str, tuple[str, bool]]:
+        """
+        Stored food id -> (name, verdict) classified under the given keyword
+        list version; verdicts from other versions are ignored.
+        """
+        return {
+            row[0]: (row[1], bool(row[2]))
+            for row in self.conn.execute(
+                "SELECT id, name, verdict FROM food_verdicts WHERE keywords = ?",
+                (keywords,),
+            )
+        }
+
+    def replace_food_verdicts(
+        self, keywords: str, verdicts: dict[str, tuple[str, bool]]
+    ):
+        self.conn.execute("DELETE FROM food_verdicts")
+        self.conn.executemany(
+            "INSERT INTO food_verdicts (id, name, keywords, verdict) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (food_id, name, keywords, verdict)
+                for food_id, (name, verdict) in verdicts.items()
+            ],
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def add_snapshot_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--refresh",
+        choices=["incremental", "full"],
+        default="incremental",
+        help="Reuse unchanged recipes from the local snapshot (incremental, "
+        "the default) or discard it and refetch everything (full).",
+    )
+
+
+def open_snapshot(args: argparse.Namespace) -> Snapshot:
+    snapshot = Snapshot()
+    if args.refresh == "full":
+        snapshot.clear()
+    return snapshot
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    add_snapshot_arguments(parser)
+    add_pagination_arguments(parser)
+    add_profile_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    snapshot = open_snapshot(args)
+    try:
+        print("Syncing recipes from Mealie…")
+        stats = await run_pipeline(
+            client,
+            lambda recipe: None,
+            snapshot=snapshot,
+            per_page=args.page_size,
+            page_concurrency=args.page_concurrency,
+        )
+        print(
+            f"\nDone. {stats.scanned} recipes: {snapshot.misses} fetched, "
+            f"{snapshot.hits} unchanged."
+        )
+    finally:
+        snapshot.close()
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sync the local snapshot of Mealie recipes."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
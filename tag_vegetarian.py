@@ -1,8 +1,14 @@
+import argparse
 import asyncio
+import hashlib
+import json
 import re
-from mealie_client import MealieClient
-from mealie_client.models.common import RecipeTag
-from common import BASE_URL, API_TOKEN
+from common import mealie_session
+from pagination import get_organizers
+from profiling import profiled
+from records import RecipeRecord
+from rules import Rule, add_rule_arguments, run_rules
+from snapshot import Snapshot
 
 MEAT_FISH_KEYWORDS: list[str] = [
     "anchovy", "bacon", "bass", "beef", "brisket",
@@ -30,128 +36,167 @@ _NON_MEAT_FOODS: set[str] = {
     "oyster sauce",
 }
 
-
-def has_meat_or_fish(recipe) -> bool:
+# Stored food verdicts are only reused while the keyword lists are unchanged
+_KEYWORDS_VERSION = hashlib.sha1(
+    json.dumps([MEAT_FISH_KEYWORDS, sorted(_NON_MEAT_FOODS)]).encode()
+).hexdigest()
+
+
+def food_has_meat_or_fish(food_name: str) -> bool:
+    return (
+        bool(food_name)
+        and food_name.lower() not in _NON_MEAT_FOODS
+        and bool(_MEAT_FISH_RE.search(food_name))
+    )
+
+
+@profiled
+def classify_foods(foods: list[dict], snapshot: Snapshot) -> dict[str, bool]:
+    """
+    Food id -> whether it is meat or fish. Verdicts are kept in the snapshot
+    and only recomputed for new or renamed foods.
+    """
+    stored = snapshot.food_verdicts(_KEYWORDS_VERSION)
+    verdicts: dict[str, tuple[str, bool]] = {}
+    for food in foods:
+        name = food.get("name") or ""
+        cached = stored.get(food["id"])
+        if cached is not None and cached[0] == name:
+            verdicts[food["id"]] = cached
+        else:
+            verdicts[food["id"]] = (name, food_has_meat_or_fish(name))
+    snapshot.replace_food_verdicts(_KEYWORDS_VERSION, verdicts)
+    snapshot.commit()
+    return {food_id: verdict for food_id, (_, verdict) in verdicts.items()}
+
+
+@profiled
+def has_meat_or_fish(recipe, meat_foods: dict[str, bool] | None = None) -> bool:
+    """
+    Parsed ingredients whose food is in `meat_foods` are settled by its
+    verdict; anything else falls back to scanning the food name and text.
+    """
     name = getattr(recipe, "name", "") or ""
     if _MEAT_FISH_RE.search(name):
         return True
 
-    ingredients = getattr(recipe, "recipeIngredient", [])
-    for ing in ingredients:
-        food = ing.get("food")
-        if isinstance(food, dict):
-            food_name = (food.get("name") or "")
-            if food_name and food_name.lower() not in _NON_MEAT_FOODS:
-                if _MEAT_FISH_RE.search(food_name):
-                    return True
-
-        text = (ing.get("text") or "")
-        if text and _MEAT_FISH_RE.search(text):
+    for ing in recipe.ingredients:
+        if meat_foods and ing.food_id in meat_foods:
+            if meat_foods[ing.food_id]:
+                return True
+            continue
+        if food_has_meat_or_fish(ing.food_name or ""):
+            return True
+
+        if ing.text and _MEAT_FISH_RE.search(ing.text):
             return True
 
-        original_text = (ing.get("originalText") or "")
-        if original_text and _MEAT_FISH_RE.search(original_text):
+        if ing.original_text and _MEAT_FISH_RE.search(ing.original_text):
             return True
 
     return False
 
 
-async def main():
-    async with MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client:
+class VegetarianRule(Rule):
+    """Keep the Vegetarian tag in line with a recipe's ingredients."""
+
+    name = "vegetarian"
+    skip_fetch_errors = True
+    fields = frozenset({"name", "tags", "ingredients"})
+
+    def __init__(self):
+        self.veg_tag: dict | None = None
+        self.meat_foods: dict[str, bool] = {}
+        self.tagged_count = 0
+        self.untagged_count = 0
+
+    async def load(self, client, snapshot: Snapshot | None = None) -> bool:
         print("Fetching tags from Mealie…")
-        veg_tag: RecipeTag | None = None
-        page = 1
-        while True:
-            tags_response = await client.get(
-                "organizers/tags", params={"page": page, "perPage": 50}
-            )
-            if isinstance(tags_response, dict) and "items" in tags_response:
-                tags_data = tags_response["items"]
-            elif isinstance(tags_response, list):
-                tags_data = tags_response
-            else:
-                tags_data = []
-
-            for t in tags_data:
-                tag = RecipeTag.from_dict(t) if isinstance(t, dict) else t
-                if tag.name.lower() == "vegetarian":
-                    veg_tag = tag
-                    break
-
-            if veg_tag is not None:
-                break
-
-            total_pages = (
-                tags_response.get("total_pages", 0) if isinstance(tags_response, dict) else 1
-            )
-            if page >= total_pages:
-                break
-            page += 1
+        for tag in await get_organizers(client, "organizers/tags"):
+            if tag["name"].lower() == "vegetarian":
+                self.veg_tag = tag
 
-        if veg_tag is None:
+        if self.veg_tag is None:
             print(
                 "❌ 'Vegetarian' tag not found in Mealie. "
                 "Create it first under Organizer > Tags."
             )
-            return
-
-        print("Fetching recipes from Mealie…")
-        all_recipes: list = []
-        page = 1
-        while True:
-            batch = await client.recipes.get_all(per_page=100, page=page)
-            if not batch:
-                break
-            all_recipes.extend(batch)
-            if len(batch) < 100:
-                break
-            page += 1
-        print(f"Found {len(all_recipes)} recipes.\n")
-
-        tagged_count = 0
-        untagged_count = 0
-        for recipe_summary in all_recipes:
-            try:
-                recipe = await client.recipes.get(recipe_summary.id)
-            except Exception:
-                continue
-
-            recipe.tags = [
-                RecipeTag.from_dict(t) if isinstance(t, dict) else t
-                for t in recipe.tags
-            ]
-            has_veg_tag = any(
-                t.name.lower() == "vegetarian" for t in recipe.tags
-            )
-            contains_meat = has_meat_or_fish(recipe)
-
-            if not has_veg_tag and not contains_meat:
-                print(f"'{recipe.name}' appears vegetarian. Tagging…")
-                recipe.tags.append(veg_tag)
-                await client.patch(
-                    f"recipes/{recipe.id}",
-                    json_data={"tags": [t.to_dict() for t in recipe.tags]},
-                )
-                tagged_count += 1
-
-            elif has_veg_tag and contains_meat:
-                print(f"'{recipe.name}' contains meat/fish. Removing Vegetarian tag…")
-                recipe.tags = [
-                    t for t in recipe.tags if t.name.lower() != "vegetarian"
-                ]
-                await client.patch(
-                    f"recipes/{recipe.id}",
-                    json_data={"tags": [t.to_dict() for t in recipe.tags]},
-                )
-                untagged_count += 1
+            return False
 
+        print("Fetching foods from Mealie…")
+        foods = await get_organizers(client, "foods")
+        if snapshot is not None:
+            self.meat_foods = classify_foods(foods, snapshot)
+            return True
+        snapshot = Snapshot()
+        try:
+            self.meat_foods = classify_foods(foods, snapshot)
+        finally:
+            snapshot.close()
+        return True
+
+    def needs_detail(self, recipe_summary) -> bool:
+        # A meaty name settles it without looking at the ingredients
+        return not _MEAT_FISH_RE.search(recipe_summary.name or "")
+
+    def scan(self, recipe):
+        # Only the verdicts this recipe's foods need travel to a worker
+        meat_foods = {
+            ing.food_id: self.meat_foods[ing.food_id]
+            for ing in recipe.ingredients
+            if ing.food_id in self.meat_foods
+        }
+        ingredients_only = RecipeRecord(
+            recipe.id, recipe.slug, recipe.name, ingredients=recipe.ingredients
+        )
+        return has_meat_or_fish, (ingredients_only, meat_foods)
+
+    def apply(self, recipe, contains_meat: bool) -> dict[str, list]:
+        has_veg_tag = any(
+            t["name"].lower() == "vegetarian" for t in recipe.tags
+        )
+
+        if not has_veg_tag and not contains_meat:
+            print(f"'{recipe.name}' appears vegetarian. Tagging…")
+            self.tagged_count += 1
+            return {"tags": recipe.tags + [self.veg_tag]}
+
+        elif has_veg_tag and contains_meat:
+            print(f"'{recipe.name}' contains meat/fish. Removing Vegetarian tag…")
+            self.untagged_count += 1
+            return {
+                "tags": [t for t in recipe.tags if t["name"].lower() != "vegetarian"]
+            }
+
+        return {}
+
+    def report(self) -> str | None:
         parts = []
-        if tagged_count:
-            parts.append(f"Tagged {tagged_count}")
-        if untagged_count:
-            parts.append(f"Untagged {untagged_count}")
-        print(f"\nDone. {'; '.join(parts)}." if parts else "\nDone. No changes.")
+        if self.tagged_count:
+            parts.append(f"Tagged {self.tagged_count}")
+        if self.untagged_count:
+            parts.append(f"Untagged {self.untagged_count}")
+        return f"{'; '.join(parts)}." if parts else "No changes."
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    add_rule_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    await run_rules(client, [VegetarianRule()], args)
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(
+        description="Tag recipes as Vegetarian when ingredients contain no meat or fish."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# The modules read their connection settings from the environment at
+# import time; the tests never talk to a real server.
+os.environ.setdefault("MEALIE_URL", "http://localhost:9000")
+os.environ.setdefault("API_TOKEN", "test")
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,22 @@
+from benchmarks.fixtures import load_example_recipe
+from benchmarks.tool_matcher import SAMPLES, find_matching_tools_loop
+from assign_tools import find_matching_tools
+from records import RecipeRecord
+
+
+def test_matcher_agrees_with_the_per_pattern_loop():
+    recipe = RecipeRecord.from_dict(load_example_recipe().to_dict())
+    for text in [" ".join(recipe.instructions), *SAMPLES]:
+        expected = find_matching_tools_loop(set(), text, recipe.name)
+        assert find_matching_tools(set(), text, recipe.name) == expected
+
+
+def test_overlapping_keywords_are_all_found():
+    matched = find_matching_tools(set(), SAMPLES[0], "")
+    assert {"Toaster Oven", "Dutch Oven", "Slow Cooker"} <= matched
+
+
+def test_tools_the_recipe_has_are_left_out():
+    text = "Bake in the oven."
+    assert find_matching_tools(set(), text, "") == {"Oven"}
+    assert find_matching_tools({"Oven"}, text, "") == set()
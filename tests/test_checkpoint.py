@@ -0,0 +1,128 @@
+import asyncio
+import json
+from checkpoint import Checkpoint
+from records import RecipeRecord
+from rules import BulkWriter
+
+TAG = {"id": "tag-vegetarian", "name": "Vegetarian", "slug": "vegetarian"}
+CATEGORY = {"id": "category-dinner", "name": "Dinner", "slug": "dinner"}
+
+
+class FakeClient:
+    def __init__(self):
+        self.posts: list[tuple[str, dict]] = []
+        self.fail = False
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def post(self, endpoint: str, json_data: dict):
+        await self.release.wait()
+        if self.fail:
+            raise ConnectionError("send failed")
+        self.posts.append((endpoint, json_data))
+
+
+def recipe(index: int) -> RecipeRecord:
+    return RecipeRecord(f"id-{index}", f"slug-{index}", f"Recipe {index}")
+
+
+def saved_done(path) -> set[str]:
+    with open(path) as f:
+        return set(json.load(f)["done"])
+
+
+def test_buffered_additions_are_not_handled_until_sent(tmp_path):
+    async def run():
+        client = FakeClient()
+        checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+        writer = BulkWriter(batch_size=2, checkpoint=checkpoint)
+        await writer(client, recipe(1), {"tags": [TAG]})
+        assert checkpoint.done == set()
+        await writer(client, recipe(2), {"tags": [TAG]})
+        assert checkpoint.done == {"id-1", "id-2"}
+        assert client.posts[0][1]["recipes"] == ["slug-1", "slug-2"]
+
+    asyncio.run(run())
+
+
+def test_recipe_is_handled_once_all_its_batches_are_sent(tmp_path):
+    async def run():
+        client = FakeClient()
+        checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+        writer = BulkWriter(batch_size=2, checkpoint=checkpoint)
+        await writer(client, recipe(1), {"tags": [TAG], "recipe_category": [CATEGORY]})
+        await writer(client, recipe(2), {"tags": [TAG]})
+        assert checkpoint.done == {"id-2"}
+        await writer.flush(client)
+        assert checkpoint.done == {"id-1", "id-2"}
+
+    asyncio.run(run())
+
+
+def test_failed_batch_is_not_handled(tmp_path):
+    async def run():
+        client = FakeClient()
+        client.fail = True
+        checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+        writer = BulkWriter(batch_size=2, checkpoint=checkpoint)
+        await writer(client, recipe(1), {"tags": [TAG]})
+        try:
+            await writer(client, recipe(2), {"tags": [TAG]})
+        except ConnectionError:
+            pass
+        await checkpoint.save()
+        assert saved_done(checkpoint.path) == set()
+
+    asyncio.run(run())
+
+
+def test_save_keeps_state_from_before_flushing(tmp_path):
+    async def run():
+        client = FakeClient()
+        path = tmp_path / "checkpoint.json"
+        writer = BulkWriter(batch_size=100)
+        checkpoint = Checkpoint(str(path), before_save=lambda: writer.flush(client))
+        writer.checkpoint = checkpoint
+        await writer(client, recipe(1), {"tags": [TAG]})
+
+        # While the flush waits on the network, another recipe is written
+        client.release.clear()
+        save = asyncio.create_task(checkpoint.save())
+        await asyncio.sleep(0)
+        await checkpoint.handled("id-2")
+        client.release.set()
+        await save
+
+        assert saved_done(path) == set()
+        assert checkpoint.done == {"id-1", "id-2"}
+        await checkpoint.save()
+        assert saved_done(path) == {"id-1", "id-2"}
+
+    asyncio.run(run())
+
+
+def test_failing_flush_still_writes_the_checkpoint(tmp_path):
+    async def run():
+        client = FakeClient()
+        path = tmp_path / "checkpoint.json"
+        writer = BulkWriter(batch_size=100)
+        checkpoint = Checkpoint(str(path), before_save=lambda: writer.flush(client))
+        writer.checkpoint = checkpoint
+        await checkpoint.handled("id-1")
+        await writer(client, recipe(2), {"tags": [TAG]})
+        client.fail = True
+
+        try:
+            await checkpoint.save()
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("the flush error was not raised")
+        assert saved_done(path) == {"id-1"}
+
+        path.unlink()
+        await writer(client, recipe(3), {"tags": [TAG]})
+        await checkpoint.save(final=True)
+        assert saved_done(path) == {"id-1"}
+
+    asyncio.run(run())
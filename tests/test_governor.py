@@ -0,0 +1,39 @@
+import time
+from governor import Governor
+
+
+def observe(governor: Governor, key: str, seconds: float):
+    governor._observe(key, time.monotonic() - seconds, governor.stalled)
+
+
+def record_decreases(governor: Governor) -> list[float]:
+    decreases = []
+    decrease = governor._decrease
+
+    def recording(factor, *args, **kwargs):
+        decreases.append(factor)
+        decrease(factor, *args, **kwargs)
+
+    governor._decrease = recording
+    return decreases
+
+
+def test_steady_fast_latency_does_not_slow_down():
+    governor = Governor()
+    decreases = record_decreases(governor)
+    # A zero-latency server, with the odd millisecond of scheduling noise
+    for i in range(500):
+        observe(governor, "GET recipes/{id}", 0.003 if i % 10 == 9 else 0.0001)
+    for _ in range(500):
+        observe(governor, "GET recipes", 0.02)
+    assert decreases == []
+    assert governor.decreases == 0
+
+
+def test_queueing_server_slows_down():
+    governor = Governor()
+    for _ in range(100):
+        observe(governor, "GET recipes/{id}", 0.02)
+    for _ in range(10):
+        observe(governor, "GET recipes/{id}", 0.2)
+    assert governor.decreases >= 1
@@ -0,0 +1,32 @@
+from merge_ingredients import FoodIndex, plan_merges
+
+
+def food(name: str, **fields) -> dict:
+    return {"id": f"id-{name}", "name": name, **fields}
+
+
+def names(waves) -> list[set[tuple[str, str]]]:
+    return [{(keep["name"], absorb["name"]) for keep, absorb in wave} for wave in waves]
+
+
+def test_chain_is_merged_innermost_first():
+    index = FoodIndex([food("a"), food("b"), food("c"), food("d")])
+    waves = plan_merges([("a", "b"), ("b", "c"), ("a", "d")], index)
+    assert names(waves) == [{("b", "c"), ("a", "d")}, {("a", "b")}]
+
+
+def test_cycle_is_skipped():
+    index = FoodIndex([food(name) for name in "abcde"])
+    waves = plan_merges([("a", "b"), ("b", "c"), ("c", "a"), ("d", "e")], index)
+    assert names(waves) == [{("d", "e")}]
+
+
+def test_names_resolve_through_plurals_and_aliases():
+    index = FoodIndex(
+        [
+            food("tomato", pluralName="tomatoes"),
+            food("scallion", aliases=[{"name": "green onion"}]),
+        ]
+    )
+    waves = plan_merges([("Tomatoes", "Green Onion")], index)
+    assert names(waves) == [{("tomato", "scallion")}]
@@ -0,0 +1,32 @@
+import asyncio
+import json
+from pathlib import Path
+from webhook import Debouncer, recipe_slugs
+
+SAMPLE_EVENT = Path(__file__).parent / "webhook-recipe-created.json"
+
+
+def test_sample_event_names_its_recipe():
+    payload = json.loads(SAMPLE_EVENT.read_text())
+    assert recipe_slugs(payload) == ["white-bean-mushroom-ragout"]
+
+
+def test_other_events_are_ignored():
+    assert recipe_slugs({"document_data": {"document_type": "shopping_list"}}) == []
+    deleted = {"document_type": "recipe", "operation": "delete", "recipe_slug": "x"}
+    assert recipe_slugs({"document_data": deleted}) == []
+
+
+def test_burst_of_events_queues_a_recipe_once():
+    async def run():
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        debouncer = Debouncer(queue, delay=0.05)
+        for _ in range(3):
+            debouncer.add("a")
+            await asyncio.sleep(0.01)
+        debouncer.add("b")
+        await asyncio.sleep(0.1)
+        assert sorted(queue.get_nowait() for _ in range(queue.qsize())) == ["a", "b"]
+        assert debouncer.timers == {}
+
+    asyncio.run(run())
@@ -1,8 +1,10 @@
+import argparse
 import asyncio
 import re
-from mealie_client import MealieClient
-from mealie_client.models.common import RecipeCategory, RecipeTag
-from common import BASE_URL, API_TOKEN
+from common import mealie_session
+from pagination import get_organizers
+from profiling import profiled
+from rules import Rule, add_rule_arguments, run_rules
 
 CATEGORY_MAP = {
     "dinner": "Dinner",
@@ -10,88 +12,82 @@ CATEGORY_MAP = {
     "breakfast": "Breakfast",
 }
 
+_CATEGORY_PATTERNS = {
+    keyword: re.compile(rf"\b{keyword}\b", re.IGNORECASE) for keyword in CATEGORY_MAP
+}
 
-async def main():
-    async with MealieClient(base_url=BASE_URL, api_token=API_TOKEN) as client:
-        print("Fetching categories from Mealie…")
 
-        categories_response = await client.get("organizers/categories")
-        if isinstance(categories_response, dict) and "items" in categories_response:
-            categories_data = categories_response["items"]
-        elif isinstance(categories_response, list):
-            categories_data = categories_response
-        else:
-            categories_data = []
+@profiled
+def matching_categories(text: str) -> list[str]:
+    """The CATEGORY_MAP keywords found in `text`, in map order."""
+    return [
+        keyword for keyword, pattern in _CATEGORY_PATTERNS.items() if pattern.search(text)
+    ]
+
 
-        all_categories: dict[str, RecipeCategory] = {}
-        for c in categories_data:
-            cat = RecipeCategory.from_dict(c) if isinstance(c, dict) else c
-            all_categories[cat.name] = cat
+class CategoryRule(Rule):
+    """Add meal categories whose keywords appear in a recipe's text or tags."""
+
+    name = "categories"
+    fields = frozenset({"name", "description", "tags", "recipe_category"})
+
+    async def load(self, client, snapshot=None) -> bool:
+        print("Fetching categories from Mealie…")
+
+        categories = await get_organizers(client, "organizers/categories")
+        self.all_categories: dict[str, dict] = {c["name"]: c for c in categories}
 
         for cat_name in CATEGORY_MAP.values():
-            if cat_name not in all_categories:
+            if cat_name not in self.all_categories:
                 print(
                     f"❌ Category '{cat_name}' not found in Mealie. Please create it."
                 )
-                return
-
-        print("Fetching recipes from Mealie…")
-        all_recipes = []
-        page = 1
-        while True:
-            batch = await client.recipes.get_all(per_page=100, page=page)
-            if not batch:
-                break
-            all_recipes.extend(batch)
-            if len(batch) < 100:
-                break
-            page += 1
-        print(f"Found {len(all_recipes)} recipes.\n")
-
-        updated_count = 0
-        for recipe_summary in all_recipes:
-            recipe = await client.recipes.get(recipe_summary.id)
-
-            recipe.tags = [
-                RecipeTag.from_dict(t) if isinstance(t, dict) else t
-                for t in recipe.tags
-            ]
-            recipe.recipe_category = [
-                RecipeCategory.from_dict(c) if isinstance(c, dict) else c
-                for c in recipe.recipe_category
-            ]
-
-            text_to_search = (
-                f"{recipe.name} {recipe.description or ''} "
-                f"{' '.join(t.name for t in recipe.tags)}"
-            ).lower()
-
-            updated = False
-            for keyword, category_name in CATEGORY_MAP.items():
-                if re.search(rf"\b{keyword}\b", text_to_search, re.IGNORECASE):
-                    category_to_add = all_categories[category_name]
-                    if not any(
-                        cat.id == category_to_add.id for cat in recipe.recipe_category
-                    ):
-                        print(
-                            f"'{recipe.name}' contains '{keyword}', adding '{category_name}' category."
-                        )
-                        recipe.recipe_category.append(category_to_add)
-                        updated = True
-
-            if updated:
-                await client.patch(
-                    f"recipes/{recipe.id}",
-                    json_data={
-                        "recipeCategory": [
-                            c.to_dict() for c in recipe.recipe_category
-                        ]
-                    },
+                return False
+        return True
+
+    def scan(self, recipe):
+        text_to_search = (
+            f"{recipe.name} {recipe.description or ''} "
+            f"{' '.join(t['name'] for t in recipe.tags)}"
+        ).lower()
+        return matching_categories, (text_to_search,)
+
+    def apply(self, recipe, keywords: list[str]) -> dict[str, list]:
+        # Build a new list so the recipe keeps its current categories, which
+        # the bulk writer compares against
+        categories = list(recipe.recipe_category)
+        for keyword in keywords:
+            category_name = CATEGORY_MAP[keyword]
+            category_to_add = self.all_categories[category_name]
+            if not any(c["id"] == category_to_add["id"] for c in categories):
+                print(
+                    f"'{recipe.name}' contains '{keyword}', adding '{category_name}' category."
                 )
-                updated_count += 1
+                categories.append(category_to_add)
+
+        if len(categories) == len(recipe.recipe_category):
+            return {}
+        return {"recipe_category": categories}
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    add_rule_arguments(parser)
 
-        print(f"\nDone. Updated {updated_count} recipes.")
+
+async def run(client, args: argparse.Namespace):
+    await run_rules(client, [CategoryRule()], args)
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(
+        description="Auto-assign Dinner/Lunch/Breakfast categories by keyword matching."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import json
+import time
+from common import mealie_session
+from maintain import RULES, rule_name
+from profiling import add_profile_arguments
+from records import RecipeRecord
+from rules import Rule, apply_rules, patch_recipe
+
+HOST = "127.0.0.1"
+PORT = 8765
+# Quiet period after the last event for a recipe before it is processed, so
+# a burst of edits (or our own PATCH echoing back) is handled once
+DEBOUNCE_SECONDS = 2.0
+WORKERS = 4
+MAX_BODY_BYTES = 1 << 20
+
+RECIPE_OPERATIONS = {"create", "update"}
+
+
+def recipe_slugs(payload: dict) -> list[str]:
+    """
+    Recipe slugs a notification is about. Mealie's JSON notifiers send the
+    event as a `document_data` object (as a JSON string with Apprise's
+    json:// URLs) holding document_type, operation and recipe_slug.
+    """
+    data = payload.get("document_data", payload)
+    if isinstance(data, str):
+        data = json.loads(data)
+    if not isinstance(data, dict):
+        return []
+    if data.get("document_type") != "recipe":
+        return []
+    if data.get("operation") not in RECIPE_OPERATIONS:
+        return []
+    slug = data.get("recipe_slug")
+    return [slug] if slug else []
+
+
+class Debouncer:
+    """Queues a recipe once no new event has arrived for it for `delay` seconds."""
+
+    def __init__(self, queue: asyncio.Queue, delay: float = DEBOUNCE_SECONDS):
+        self.queue = queue
+        self.delay = delay
+        self.timers: dict[str, asyncio.TimerHandle] = {}
+
+    def add(self, slug: str):
+        if timer := self.timers.pop(slug, None):
+            timer.cancel()
+        self.timers[slug] = asyncio.get_running_loop().call_later(
+            self.delay, self._release, slug
+        )
+
+    def _release(self, slug: str):
+        del self.timers[slug]
+        self.queue.put_nowait(slug)
+
+    def cancel(self):
+        for timer in self.timers.values():
+            timer.cancel()
+        self.timers.clear()
+
+
+async def process_recipe(client, rules: list[Rule], slug: str):
+    started = time.perf_counter()
+    recipe = RecipeRecord.from_dict(await client.get(f"recipes/{slug}"))
+    changes = await apply_rules(rules, recipe)
+    if changes:
+        await patch_recipe(client, recipe, changes)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if changes:
+        print(f"✅ '{recipe.name}': updated {', '.join(changes)} ({elapsed_ms:.0f} ms)")
+    else:
+        print(f"'{recipe.name}': no changes ({elapsed_ms:.0f} ms)")
+
+
+async def _respond(writer: asyncio.StreamWriter, status: str, payload: dict):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    writer.close()
+
+
+def connection_handler(debouncer: Debouncer):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, *_ = (await reader.readline()).decode("latin-1").split()
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                key, _, value = line.decode("latin-1").partition(":")
+                if key.strip().lower() == "content-length":
+                    length = int(value)
+            if method != "POST":
+                await _respond(writer, "405 Method Not Allowed", {"detail": "POST only"})
+                return
+            if length > MAX_BODY_BYTES:
+                await _respond(writer, "413 Payload Too Large", {"detail": "Too large"})
+                return
+            slugs = recipe_slugs(json.loads(await reader.readexactly(length)))
+        except (ValueError, AttributeError, asyncio.IncompleteReadError) as e:
+            await _respond(writer, "400 Bad Request", {"detail": str(e)})
+            return
+        for slug in slugs:
+            debouncer.add(slug)
+        await _respond(writer, "202 Accepted", {"queued": slugs})
+
+    return handle
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "rules",
+        nargs="*",
+        type=rule_name,
+        metavar="rule",
+        help=f"Rules to run: {', '.join(RULES)} (default: all).",
+    )
+    parser.add_argument(
+        "--host", default=HOST, help=f"Address to listen on (default: {HOST})."
+    )
+    parser.add_argument(
+        "--port", type=int, default=PORT, help=f"Port to listen on (default: {PORT})."
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEBOUNCE_SECONDS,
+        help="Seconds to wait after a recipe's last event before processing it "
+        f"(default: {DEBOUNCE_SECONDS}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help=f"Recipes processed at once (default: {WORKERS}).",
+    )
+    add_profile_arguments(parser)
+
+
+async def run(client, args: argparse.Namespace):
+    rules = [RULES[name]() for name in args.rules or RULES]
+    for rule in rules:
+        if not await rule.load(client):
+            return
+
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    debouncer = Debouncer(queue, args.debounce)
+    in_progress: set[str] = set()
+
+    async def worker():
+        while True:
+            slug = await queue.get()
+            if slug in in_progress:
+                # Edited again while being processed: look at it once more later
+                debouncer.add(slug)
+                continue
+            in_progress.add(slug)
+            try:
+                await process_recipe(client, rules, slug)
+            except Exception as e:
+                print(f"❌ '{slug}': {e}")
+            finally:
+                in_progress.discard(slug)
+
+    server = await asyncio.start_server(
+        connection_handler(debouncer), args.host, args.port
+    )
+    print(
+        f"Listening for Mealie recipe events on http://{args.host}:{args.port}/ "
+        f"({', '.join(rule.name for rule in rules)}). Ctrl-C to stop."
+    )
+    try:
+        async with server, asyncio.TaskGroup() as tg:
+            for _ in range(args.workers):
+                tg.create_task(worker())
+            await server.serve_forever()
+    finally:
+        debouncer.cancel()
+        for rule in rules:
+            if report := rule.report():
+                print(f"  {rule.name}: {report}")
+
+
+async def main(args: argparse.Namespace):
+    async with mealie_session(args) as client:
+        await run(client, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the recipe rules on each recipe as Mealie reports it "
+        "created or updated."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections.abc import AsyncIterator
+from SPARQLWrapper import SPARQLWrapper, JSON
+from common import WIKIDATA_CACHE_PATH, WIKIDATA_SPARQL_URL
+from governor import Governor, http_retry_after
+from profiling import profiled
+
+# Food names resolved per SPARQL query in batched lookups
+BATCH_SIZE = 25
+# Wikidata queries in flight at once, and the minimum gap between query starts
+CONCURRENCY = 4
+MIN_INTERVAL = 0.25
+# How long cached answers, including "not found", are trusted
+CACHE_TTL_DAYS = 30.0
+
+# Match on label OR alias, and fetch aliases + description. ?label is bound
+# by a VALUES block so one query can resolve many food names at once.
+_QUERY = """
+SELECT ?label ?item ?alias ?itemDescription WHERE {{
+  VALUES ?label {{ {labels} }}
+  ?item (rdfs:label|skos:altLabel) ?label .
+  FILTER(LANG(?itemDescription) = "en")
+  OPTIONAL {{ ?item skos:altLabel ?alias FILTER(LANG(?alias) = "en") }}
+  SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
+
+  {{
+    ?item (wdt:P31/(wdt:P279*)) wd:Q42527 .    # spice or subclass
+  }} UNION {{
+    ?item (wdt:P31/(wdt:P279*)) wd:Q25403900 . # food ingredient or subclass
+  }} UNION {{
+    ?item (wdt:P31/(wdt:P279*)) wd:Q185217 . # dairy product
+  }}
+}}
+"""
+
+
+# SPARQL string escapes (ECHAR) for the characters a food name may contain
+_ECHAR = str.maketrans(
+    {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+)
+
+
+def _literal(food_name: str) -> str:
+    return f'"{food_name.translate(_ECHAR)}"@en'
+
+
+def _qid(item_uri: str) -> int:
+    """http://www.wikidata.org/entity/Q42 -> 42"""
+    return int(item_uri.rsplit("/Q", 1)[1])
+
+
+@profiled
+def get_wikidata_info_batch(
+    food_names: list[str], endpoint: str = WIKIDATA_SPARQL_URL
+) -> dict[str, tuple[list[str], str | None]]:
+    """
+    Look up several food names in one SPARQL query.
+
+    Returns a mapping of every requested name to its (aliases, description);
+    names Wikidata does not know map to ([], None). A name matching several
+    items gets the aliases of all of them and the description of the one
+    with the lowest QID.
+    """
+    sparql = SPARQLWrapper(endpoint, agent="mealie-data-tools")
+    sparql.setReturnFormat(JSON)
+    sparql.setQuery(
+        _QUERY.format(labels=" ".join(_literal(name) for name in food_names))
+    )
+
+    aliases: dict[str, set[str]] = {name: set() for name in food_names}
+    descriptions: dict[str, str | None] = {name: None for name in food_names}
+    # QID of the item each description came from
+    described_by: dict[str, int] = {}
+    results = sparql.query().convert()
+    for result in results["results"]["bindings"]:
+        label = result["label"]["value"]
+        if label not in aliases:
+            continue
+        if "alias" in result:
+            aliases[label].add(result["alias"]["value"])
+        if "itemDescription" in result:
+            qid = _qid(result["item"]["value"])
+            if qid < described_by.get(label, qid + 1):
+                described_by[label] = qid
+                descriptions[label] = result["itemDescription"]["value"]
+
+    return {name: (list(aliases[name]), descriptions[name]) for name in food_names}
+
+
+def normalize_food_name(food_name: str) -> str:
+    return " ".join(food_name.split()).casefold()
+
+
+class WikidataCache:
+    """
+    On-disk cache of Wikidata answers keyed by normalized food name.
+
+    Misses are stored too, so foods Wikidata does not know are not asked
+    about again until their entry is older than the TTL.
+    """
+
+    def __init__(
+        self, path: str = WIKIDATA_CACHE_PATH, ttl_days: float = CACHE_TTL_DAYS
+    ):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS wikidata ("
+            "key TEXT PRIMARY KEY, aliases TEXT NOT NULL, description TEXT, "
+            "fetched_at REAL NOT NULL)"
+        )
+        self.ttl = ttl_days * 86400
+
+    def get(self, food_name: str) -> tuple[list[str], str | None] | None:
+        row = self.conn.execute(
+            "SELECT aliases, description FROM wikidata "
+            "WHERE key = ? AND fetched_at > ?",
+            (normalize_food_name(food_name), time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, food_name: str, aliases: list[str], description: str | None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO wikidata (key, aliases, description, fetched_at) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                normalize_food_name(food_name),
+                json.dumps(aliases),
+                description,
+                time.time(),
+            ),
+        )
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class AsyncWikidataClient:
+    """
+    Runs Wikidata lookups off the event loop.
+
+    SPARQLWrapper is blocking, so each batch query runs in a worker thread.
+    At most `concurrency` queries are in flight and query starts are spaced
+    at least `min_interval` seconds apart, to stay within the public
+    endpoint's usage policy. The client's governor backs off further when
+    the endpoint throttles (429) or fails, and retries those queries.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = WIKIDATA_SPARQL_URL,
+        cache: WikidataCache | None = None,
+        concurrency: int = CONCURRENCY,
+        min_interval: float = MIN_INTERVAL,
+    ):
+        self.endpoint = endpoint
+        self.cache = cache
+        self.governor = Governor(
+            initial=concurrency,
+            max_limit=concurrency,
+            rate=1 / min_interval if min_interval > 0 else None,
+        )
+
+    async def _query(
+        self, batch: list[str]
+    ) -> dict[str, tuple[list[str], str | None]]:
+        try:
+            results = await self.governor.run(
+                "sparql",
+                lambda: asyncio.to_thread(get_wikidata_info_batch, batch, self.endpoint),
+                http_retry_after,
+            )
+        except Exception as e:
+            print(f"Error querying Wikidata for {len(batch)} foods: {e}")
+            return {}
+        if self.cache is not None:
+            for name, (aliases, description) in results.items():
+                self.cache.put(name, aliases, description)
+            self.cache.conn.commit()
+        return results
+
+    async def lookup(
+        self, food_names: list[str], batch_size: int = BATCH_SIZE
+    ) -> AsyncIterator[tuple[str, tuple[list[str], str | None]]]:
+        """
+        Yield (food name, (aliases, description)) for each name, cached
+        answers first, then batch by batch as queries complete. Names whose
+        batch failed are not yielded.
+        """
+        pending = []
+        for name in dict.fromkeys(food_names):
+            cached = self.cache.get(name) if self.cache is not None else None
+            if cached is None:
+                pending.append(name)
+            else:
+                yield name, cached
+
+        tasks = [
+            asyncio.create_task(self._query(pending[start : start + batch_size]))
+            for start in range(0, len(pending), batch_size)
+        ]
+        try:
+            for next_batch in asyncio.as_completed(tasks):
+                for name, info in (await next_batch).items():
+                    yield name, info
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.governor.close()
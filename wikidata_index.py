@@ -0,0 +1,228 @@
+import argparse
+import bz2
+import gzip
+import json
+import sqlite3
+from collections.abc import AsyncIterator, Iterator
+
+# The classes the SPARQL lookup in wikidata.py restricts matches to
+FOOD_CLASSES: dict[int, str] = {
+    42527: "spice",
+    25403900: "food ingredient",
+    185217: "dairy product",
+}
+
+INDEX_PATH = "wikidata_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    qid INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    aliases TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS labels (
+    label TEXT NOT NULL,
+    qid INTEGER NOT NULL,
+    PRIMARY KEY (label, qid)
+) WITHOUT ROWID;
+"""
+
+
+def _open_dump(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_entities(path: str) -> Iterator[dict]:
+    """
+    Stream entities from a Wikidata JSON dump (or a filtered extract in the
+    same one-entity-per-line format) without loading it into memory.
+    """
+    with _open_dump(path) as dump:
+        for line in dump:
+            line = line.strip().rstrip(",")
+            if not line or line in ("[", "]"):
+                continue
+            yield json.loads(line)
+
+
+def _claim_targets(entity: dict, prop: str) -> Iterator[int]:
+    for claim in entity.get("claims", {}).get(prop, []):
+        if claim.get("rank") == "deprecated":
+            continue
+        datavalue = claim.get("mainsnak", {}).get("datavalue")
+        if datavalue and datavalue.get("type") == "wikibase-entityid":
+            yield datavalue["value"]["numeric-id"]
+
+
+def read_class_ids(path: str) -> set[int]:
+    """Read QIDs (one per line, with or without the Q prefix)."""
+    with open(path) as f:
+        return {int(line.strip().lstrip("Q")) for line in f if line.strip()}
+
+
+def food_class_ids(dump_path: str) -> set[int]:
+    """
+    Compute every subclass (P279*) of FOOD_CLASSES with an extra pass over
+    the dump. Subclass edges are spilled to a temporary on-disk database and
+    walked there with a recursive query, so memory stays constant however
+    many edges the dump holds; only the resulting classes are kept.
+    """
+    # An empty name opens a private database in a temporary file
+    conn = sqlite3.connect("")
+    conn.execute("CREATE TABLE edges (parent INTEGER NOT NULL, child INTEGER NOT NULL)")
+    edges: list[tuple[int, int]] = []
+    for entity in iter_entities(dump_path):
+        if entity.get("type") != "item":
+            continue
+        child = int(entity["id"][1:])
+        edges.extend((parent, child) for parent in _claim_targets(entity, "P279"))
+        if len(edges) >= 10000:
+            conn.executemany("INSERT INTO edges VALUES (?, ?)", edges)
+            edges.clear()
+    conn.executemany("INSERT INTO edges VALUES (?, ?)", edges)
+    # Indexing once the edges are in is much faster than keeping it up to date
+    conn.execute("CREATE INDEX edges_parent ON edges (parent)")
+
+    roots = ", ".join(f"({qid})" for qid in FOOD_CLASSES)
+    rows = conn.execute(
+        f"""
+        WITH RECURSIVE classes(qid) AS (
+            VALUES {roots}
+            UNION
+            SELECT child FROM edges JOIN classes ON parent = qid
+        )
+        SELECT qid FROM classes
+        """
+    )
+    class_ids = {qid for (qid,) in rows}
+    conn.close()
+    return class_ids
+
+
+def build_index(
+    dump_path: str, class_ids: set[int], index_path: str = INDEX_PATH
+) -> int:
+    """
+    Stream the dump and store every item that is an instance of one of
+    `class_ids` and has an English description, keyed by its English label
+    and aliases. Returns the number of entities stored.
+    """
+    conn = sqlite3.connect(index_path)
+    conn.executescript(_SCHEMA)
+    conn.execute("DELETE FROM entities")
+    conn.execute("DELETE FROM labels")
+
+    stored = 0
+    for entity in iter_entities(dump_path):
+        if entity.get("type") != "item":
+            continue
+        if not any(target in class_ids for target in _claim_targets(entity, "P31")):
+            continue
+        description = entity.get("descriptions", {}).get("en", {}).get("value")
+        if not description:
+            continue
+
+        qid = int(entity["id"][1:])
+        aliases = [a["value"] for a in entity.get("aliases", {}).get("en", [])]
+        label = entity.get("labels", {}).get("en", {}).get("value")
+        conn.execute(
+            "INSERT OR REPLACE INTO entities (qid, description, aliases) "
+            "VALUES (?, ?, ?)",
+            (qid, description, json.dumps(aliases)),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO labels (label, qid) VALUES (?, ?)",
+            [(name, qid) for name in {label, *aliases} if name],
+        )
+        stored += 1
+        if stored % 10000 == 0:
+            conn.commit()
+            print(f"  {stored} entities indexed…")
+
+    conn.commit()
+    conn.close()
+    return stored
+
+
+class WikidataIndex:
+    """
+    Offline replacement for AsyncWikidataClient backed by an index built
+    with `build_index`. The whole index is loaded into dictionaries, so each
+    lookup is a couple of dict hits.
+    """
+
+    def __init__(self, index_path: str = INDEX_PATH):
+        conn = sqlite3.connect(index_path)
+        self.entities: dict[int, tuple[str, list[str]]] = {
+            qid: (description, json.loads(aliases))
+            for qid, description, aliases in conn.execute(
+                "SELECT qid, description, aliases FROM entities"
+            )
+        }
+        self.labels: dict[str, list[int]] = {}
+        for label, qid in conn.execute("SELECT label, qid FROM labels"):
+            self.labels.setdefault(label, []).append(qid)
+        conn.close()
+
+    def get(self, food_name: str) -> tuple[list[str], str | None]:
+        """
+        Same answer as wikidata.get_wikidata_info_batch, for one food: the
+        aliases of every matching item, and the description of the one with
+        the lowest QID.
+        """
+        qids = self.labels.get(food_name, [])
+        aliases: set[str] = set()
+        for qid in qids:
+            aliases.update(self.entities[qid][1])
+        description = self.entities[min(qids)][0] if qids else None
+        return list(aliases), description
+
+    async def lookup(
+        self, food_names: list[str], batch_size: int = 0
+    ) -> AsyncIterator[tuple[str, tuple[list[str], str | None]]]:
+        for name in dict.fromkeys(food_names):
+            yield name, self.get(name)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "dump",
+        help="Wikidata JSON dump or filtered extract (.json, .json.gz or .json.bz2).",
+    )
+    parser.add_argument(
+        "--classes",
+        help="File of class QIDs to keep (the subclasses of spice, food "
+        "ingredient and dairy product). Computed from the dump with an extra "
+        "pass, spilling subclass edges to a temporary file, when omitted.",
+    )
+    parser.add_argument("--output", default=INDEX_PATH)
+
+
+async def run(client, args: argparse.Namespace):
+    """Entry point for main.py; the index is built without Mealie."""
+    main(args)
+
+
+def main(args: argparse.Namespace):
+    if args.classes:
+        class_ids = read_class_ids(args.classes)
+    else:
+        print("Collecting food classes from the dump…")
+        class_ids = food_class_ids(args.dump)
+    print(f"Indexing instances of {len(class_ids)} classes…")
+    stored = build_index(args.dump, class_ids, args.output)
+    print(f"\nDone. Indexed {stored} entities into {args.output}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build an offline Wikidata food index from a JSON dump."
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    main(args)